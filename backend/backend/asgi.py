@@ -0,0 +1,16 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Под ASGI синхронный код каждого запроса выполняется в новом потоке,
+# и постоянные соединения Django (CONN_MAX_AGE) не переиспользуются,
+# а копятся. Поэтому по умолчанию соединения берутся из пула.
+os.environ.setdefault('DB_POOL_ENABLED', 'true')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+application = get_asgi_application()
+
+from backend_foodgram.warmup import warm_up  # noqa: E402
+
+warm_up()
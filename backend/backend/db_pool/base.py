@@ -0,0 +1,36 @@
+from django.db.backends.postgresql import base
+
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Бэкенд PostgreSQL, берущий соединения из пула процесса
+    вместо открытия нового соединения на каждый запрос.
+    Закрытие соединения возвращает его в пул.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+
+        def connect():
+            connection = super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+            pool.isolation_level = self.isolation_level
+            return connection
+
+        connection = pool.acquire(connect)
+        self.isolation_level = pool.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        discard = self.errors_occurred and not self.is_usable()
+        with self.wrap_database_errors:
+            self.pool.release(self.connection, discard=discard)
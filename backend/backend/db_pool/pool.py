@@ -0,0 +1,178 @@
+from collections import deque
+from threading import BoundedSemaphore, Lock
+
+from django.db import OperationalError
+
+import time
+
+_pools = {}
+_pools_lock = Lock()
+
+
+class ConnectionPool:
+    """
+    Класс, хранящий открытые соединения с БД для повторного
+    использования разными потоками одного процесса.
+    Одновременно выдается не больше max_size соединений, остальные
+    потоки ждут освобождения до timeout секунд.
+    Соединения, простоявшие без дела дольше max_idle секунд, закрываются.
+    Перед выдачей соединение проверяется: обрыв со стороны сервера
+    виден без запроса, а простоявшее дольше ping_after секунд
+    дополнительно проверяется запросом SELECT 1.
+    """
+
+    def __init__(self, alias, max_size, timeout, max_idle, ping_after=10):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self.isolation_level = None
+        self._slots = BoundedSemaphore(max_size)
+        self._idle = deque()
+        self._lock = Lock()
+        self._in_use = 0
+        self._counters = dict.fromkeys(
+            ('created', 'reused', 'discarded', 'timeouts', 'waits'), 0
+        )
+        self._wait_time = 0.0
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _close(self, connection):
+        self._count('discarded')
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def is_alive(self, connection, idle_time):
+        """
+        Метод, проверяющий, что соединение живо.
+        poll() читает из сокета уже пришедшие данные, не отправляя запрос,
+        и падает, если сервер закрыл соединение (перезапуск, убитый
+        процесс, idle-таймаут).
+        """
+        if connection.closed:
+            return False
+        try:
+            connection.poll()
+            if idle_time > self.ping_after:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def acquire(self, connect):
+        """
+        Метод, выдающий соединение из пула.
+        Если свободных соединений нет, новое открывается через connect().
+        """
+        if not self._slots.acquire(blocking=False):
+            started = time.perf_counter()
+            acquired = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self._counters['waits'] += 1
+                self._wait_time += time.perf_counter() - started
+                if not acquired:
+                    self._counters['timeouts'] += 1
+            if not acquired:
+                raise OperationalError(
+                    f'Пул соединений {self.alias} исчерпан: нет свободного '
+                    f'соединения за {self.timeout} с.'
+                )
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, released_at = self._idle.pop()
+                idle_time = time.monotonic() - released_at
+                if idle_time > self.max_idle or not self.is_alive(
+                    connection, idle_time
+                ):
+                    self._close(connection)
+                    continue
+                with self._lock:
+                    self._counters['reused'] += 1
+                    self._in_use += 1
+                return connection
+            connection = connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._counters['created'] += 1
+            self._in_use += 1
+        return connection
+
+    def release(self, connection, discard=False):
+        """
+        Метод, возвращающий соединение в пул.
+        Незавершенная транзакция откатывается, сломанное соединение
+        закрывается.
+        """
+        if not discard and not connection.closed:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        try:
+            if discard or connection.closed:
+                self._close(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'size': self._in_use + len(self._idle),
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                **self._counters,
+                'wait_time': round(self._wait_time, 3),
+            }
+
+
+def get_pool(alias, settings_dict):
+    """
+    Функция, возвращающая пул соединений для базы alias.
+    Пул привязан к имени базы: после переключения alias на другую базу
+    (например, тестовую) соединения со старой базой не выдаются.
+    """
+    key = alias, settings_dict['NAME']
+    with _pools_lock:
+        if key not in _pools:
+            options = settings_dict.get('POOL', {})
+            _pools[key] = ConnectionPool(
+                alias,
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 10),
+                max_idle=options.get('MAX_IDLE', 300),
+                ping_after=options.get('PING_AFTER', 10)
+            )
+        return _pools[key]
+
+
+def get_pool_stats():
+    """
+    Функция, возвращающая статистику всех пулов соединений процесса
+    по ключам вида alias/имя базы.
+    Если пул не используется, возвращается пустой словарь.
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {
+        f'{alias}/{name}': pool.get_stats()
+        for (alias, name), pool in pools.items()
+    }
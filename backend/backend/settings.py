@@ -64,6 +64,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
+
+# Под ASGI пул включен по умолчанию (см. backend/asgi.py).
+DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'false').lower() == 'true'
 
 DATABASES = {
     's': {
@@ -71,12 +75,28 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     },
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'backend.db_pool' if DB_POOL_ENABLED
+            else 'django.db.backends.postgresql'
+        ),
         'NAME': os.getenv('POSTGRES_DB', 'django'),
         'USER': os.getenv('POSTGRES_USER', 'django'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'db'),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        # С пулом соединение возвращается в пул после каждого запроса.
+        'CONN_MAX_AGE': (
+            0 if DB_POOL_ENABLED else int(os.getenv('DB_CONN_MAX_AGE', 60))
+        ),
+        'CONN_HEALTH_CHECKS': (
+            os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+        ),
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            'MAX_IDLE': int(os.getenv('DB_POOL_MAX_IDLE', 300)),
+            'PING_AFTER': float(os.getenv('DB_POOL_PING_AFTER', 10)),
+        },
     }
 }
 
@@ -84,6 +104,26 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
+# Первый хешер используется для новых паролей, хеши остальных
+# пересчитываются им при успешном входе.
+PASSWORD_HASHER = os.getenv(
+    'PASSWORD_HASHER', 'backend_foodgram.hashers.PBKDF2PasswordHasher'
+)
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher for hasher in (
+        'backend_foodgram.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ) if hasher != PASSWORD_HASHER
+]
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.getenv('PASSWORD_PBKDF2_ITERATIONS', 600000)
+)
+PASSWORD_CHECK_WORKERS = int(os.getenv('PASSWORD_CHECK_WORKERS', 2))
+PASSWORD_CHECK_QUEUE_SIZE = int(os.getenv('PASSWORD_CHECK_QUEUE_SIZE', 16))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -121,6 +161,67 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DATAFILES_DIR = BASE_DIR / 'data'
 
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', 2))
+IMAGE_PROCESSING_QUEUE_SIZE = int(os.getenv('IMAGE_PROCESSING_QUEUE_SIZE', 32))
+RECIPE_THUMBNAIL_SIZE = (480, 360)
+RECIPE_IMAGE_MAX_UPLOAD_SIZE = int(
+    os.getenv('RECIPE_IMAGE_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+)
+RECIPE_MAX_PIXELS = int(os.getenv('RECIPE_MAX_PIXELS', 6000 * 6000))
+
+FEED_FANOUT_WORKERS = int(os.getenv('FEED_FANOUT_WORKERS', 1))
+FEED_FANOUT_QUEUE_SIZE = int(os.getenv('FEED_FANOUT_QUEUE_SIZE', 64))
+FEED_FANOUT_BATCH_SIZE = int(os.getenv('FEED_FANOUT_BATCH_SIZE', 1000))
+# Рецепты авторов с таким числом подписчиков и больше не рассылаются
+# по лентам, а подмешиваются при чтении.
+FEED_PULL_FOLLOWERS_THRESHOLD = int(
+    os.getenv('FEED_PULL_FOLLOWERS_THRESHOLD', 10000)
+)
+FEED_PULL_AUTHORS_TTL = int(os.getenv('FEED_PULL_AUTHORS_TTL', 300))
+FEED_BACKFILL_SIZE = int(os.getenv('FEED_BACKFILL_SIZE', 100))
+
+AVATAR_MAX_UPLOAD_SIZE = int(os.getenv('AVATAR_MAX_UPLOAD_SIZE', 2 * 1024 * 1024))
+AVATAR_SIZE = (256, 256)
+AVATAR_MAX_PIXELS = int(os.getenv('AVATAR_MAX_PIXELS', 4096 * 4096))
+
+# Общий для всех процессов кеш. Без CACHE_REDIS_URL используется кеш
+# в памяти процесса: сброс записей в нем не виден другим воркерам.
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': 'foodgram',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+INGREDIENT_INDEX_TTL = int(os.getenv('INGREDIENT_INDEX_TTL', 300))
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 300))
+
+SHORT_LINK_LOCAL_CACHE_SIZE = int(
+    os.getenv('SHORT_LINK_LOCAL_CACHE_SIZE', 4096)
+)
+SHORT_LINK_LOCAL_CACHE_TTL = int(os.getenv('SHORT_LINK_LOCAL_CACHE_TTL', 300))
+SHORT_LINK_CACHE_TIMEOUT = int(os.getenv('SHORT_LINK_CACHE_TIMEOUT', 86400))
+SHORT_LINK_REDIRECT_MAX_AGE = int(
+    os.getenv('SHORT_LINK_REDIRECT_MAX_AGE', 300)
+)
+
+TOKEN_AUTH_LOCAL_CACHE_SIZE = int(
+    os.getenv('TOKEN_AUTH_LOCAL_CACHE_SIZE', 4096)
+)
+TOKEN_AUTH_LOCAL_CACHE_TTL = int(os.getenv('TOKEN_AUTH_LOCAL_CACHE_TTL', 10))
+TOKEN_AUTH_CACHE_TIMEOUT = int(os.getenv('TOKEN_AUTH_CACHE_TIMEOUT', 300))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.User'
 
@@ -130,7 +231,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'backend_foodgram.authentication.CachedTokenAuthentication',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'backend_foodgram.pagination.PageLimitPagination',
@@ -155,6 +256,22 @@ DJOSER = {
     }
 }
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'backend_foodgram': {
+            'handlers': ('console',),
+            'level': os.getenv('BACKEND_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 CORS_URLS_REGEX = r'^/api/.*$'
 CORS_ALLOWED_ORIGINS = [
     'http://127.0.0.1:3000',
@@ -0,0 +1,27 @@
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR
+
+import os
+import tempfile
+
+SECRET_KEY = 'test'
+
+# С TEST_POSTGRES=true тесты используют PostgreSQL из основных настроек:
+# так запускаются проверки, которые есть только для PostgreSQL.
+if os.getenv('TEST_POSTGRES', 'false').lower() != 'true':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'test.sqlite3',
+        }
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='foodgram-test-media-')
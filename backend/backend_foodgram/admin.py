@@ -7,10 +7,22 @@ from .models import (
     Tag, Ingredient, Recipe, RecipeIngredient, Favorite,
     ShoppingCart, RecipeShortLink, RecipeTag
 )
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(ModelAdmin):
+    """
+    Базовый класс админки для больших таблиц: приблизительное
+    число строк без фильтров и без повторного COUNT(*) при поиске.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = settings.EMPTY_VALUE
 
 
 class RecipeIngredientInline(TabularInline):
     model = RecipeIngredient
+    autocomplete_fields = ('ingredient',)
 
 
 @register(Tag)
@@ -25,47 +37,52 @@ class TagAdmin(ModelAdmin):
 class IngredientAdmin(ModelAdmin):
     list_display = ('id', 'name', 'measurement_unit')
     search_fields = ('name',)
-    list_filter = ('name', 'measurement_unit')
+    list_filter = ('measurement_unit',)
+    ordering = ('name',)
     empty_value_display = settings.EMPTY_VALUE
 
 
 @register(Recipe)
-class RecipeAdmin(ModelAdmin):
-    list_display = ('id', 'name', 'author', 'get_favorites_count')
-    search_fields = ('author', 'name')
+class RecipeAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'author', 'favorites_count')
+    list_select_related = ('author',)
+    search_fields = ('name', 'author__username')
     list_filter = ('tags',)
-    empty_value_display = settings.EMPTY_VALUE
-
-    def get_favorites_count(self, obj):
-        return obj.favorites.count()
-    get_favorites_count.short_description = 'В избранном'
+    autocomplete_fields = ('author',)
+    inlines = (RecipeIngredientInline,)
 
 
 @register(RecipeTag)
-class RecipeTagAdmin(ModelAdmin):
+class RecipeTagAdmin(LargeTableAdmin):
     list_display = ('id', 'recipe', 'tag')
-    empty_value_display = settings.EMPTY_VALUE
+    list_select_related = ('recipe', 'tag')
+    autocomplete_fields = ('recipe', 'tag')
 
 
 @register(RecipeIngredient)
-class RecipeIngredientAdmin(ModelAdmin):
+class RecipeIngredientAdmin(LargeTableAdmin):
     list_display = ('id', 'recipe', 'ingredient', 'amount')
-    empty_value_display = settings.EMPTY_VALUE
+    list_select_related = ('recipe', 'ingredient')
+    autocomplete_fields = ('recipe', 'ingredient')
 
 
 @register(Favorite)
-class FavoriteAdmin(ModelAdmin):
+class FavoriteAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'recipe')
-    empty_value_display = settings.EMPTY_VALUE
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
 
 
 @register(ShoppingCart)
-class ShoppingCartAdmin(ModelAdmin):
+class ShoppingCartAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'recipe')
-    empty_value_display = settings.EMPTY_VALUE
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
 
 
 @register(RecipeShortLink)
-class RecipeShortLinkAdmin(ModelAdmin):
+class RecipeShortLinkAdmin(LargeTableAdmin):
     list_display = ('id', 'recipe', 'short_link')
-    empty_value_display = settings.EMPTY_VALUE
+    list_select_related = ('recipe',)
+    search_fields = ('short_link',)
+    autocomplete_fields = ('recipe',)
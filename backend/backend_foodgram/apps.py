@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BackendFoodgramConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend_foodgram'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .cache import LRUCache, is_cache_shared
+
+import hashlib
+
+User = get_user_model()
+
+# Хеш пароля в кеш не попадает, при обращении он загрузится из БД.
+CACHED_USER_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname != 'password'
+)
+
+token_cache = LRUCache(
+    settings.TOKEN_AUTH_LOCAL_CACHE_SIZE,
+    settings.TOKEN_AUTH_LOCAL_CACHE_TTL
+)
+
+
+def get_token_cache_key(key):
+    return f'token_user:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def dump_user(user):
+    return {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+
+
+def load_user(data):
+    return User.from_db(User.objects.db, list(data), list(data.values()))
+
+
+def get_cached_token_user(key):
+    """
+    Функция, возвращающая пользователя по токену из LRU-кеша процесса
+    или общего кеша Django. Если токена нет в кешах, возвращает None.
+    """
+    data = token_cache.get(key)
+    if data is None:
+        if not is_cache_shared():
+            return None
+        data = cache.get(get_token_cache_key(key))
+        if data is None:
+            return None
+        token_cache.set(key, data)
+    return load_user(data)
+
+
+async def aget_cached_token_user(key):
+    """
+    Асинхронная версия get_cached_token_user.
+    """
+    data = token_cache.get(key)
+    if data is None:
+        if not is_cache_shared():
+            return None
+        data = await cache.aget(get_token_cache_key(key))
+        if data is None:
+            return None
+        token_cache.set(key, data)
+    return load_user(data)
+
+
+def cache_token_user(key, user):
+    data = dump_user(user)
+    token_cache.set(key, data)
+    if is_cache_shared():
+        cache.set(
+            get_token_cache_key(key), data, settings.TOKEN_AUTH_CACHE_TIMEOUT
+        )
+
+
+async def acache_token_user(key, user):
+    data = dump_user(user)
+    token_cache.set(key, data)
+    if is_cache_shared():
+        await cache.aset(
+            get_token_cache_key(key), data, settings.TOKEN_AUTH_CACHE_TIMEOUT
+        )
+
+
+def invalidate_token(key):
+    """
+    Функция, удаляющая токен из кешей.
+    В других процессах запись из LRU-кеша пропадет
+    не позже чем через TOKEN_AUTH_LOCAL_CACHE_TTL секунд.
+    Если кеш Django не общий (CACHE_REDIS_URL не задан), он не используется
+    вовсе: удаление из него не дошло бы до других воркеров.
+    """
+    token_cache.delete(key)
+    cache.delete(get_token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по токену, кеширующая пользователя токена.
+    Запрос к БД выполняется, только если токена нет в кешах.
+    Невалидные токены и неактивные пользователи не кешируются.
+    """
+
+    def authenticate_credentials(self, key):
+        user = get_cached_token_user(key)
+        if user is not None:
+            return user, Token(key=key, user=user)
+        user, token = super().authenticate_credentials(key)
+        cache_token_user(key, user)
+        return user, token
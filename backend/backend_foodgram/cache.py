@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+import time
+
+
+def is_cache_shared():
+    """
+    Функция, проверяющая, что кеш Django общий для всех процессов.
+    Кеш в памяти процесса общим не считается: удаление записи
+    в одном воркере не видно остальным.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+class LRUCache:
+    """
+    Ограниченный по размеру кеш в памяти процесса.
+    При переполнении вытесняются давно не использованные ключи,
+    записи старше ttl секунд считаются отсутствующими.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = (
+            time.monotonic() + self.ttl if self.ttl is not None else None
+        )
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
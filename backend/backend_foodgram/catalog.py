@@ -0,0 +1,155 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from .cache import is_cache_shared
+
+import gzip
+import hashlib
+import time
+
+
+def get_catalog_version_key(catalog):
+    return f'catalog_version:{catalog}'
+
+
+def get_catalog_version_timeout():
+    """
+    Функция, возвращающая время жизни версии справочника.
+    В общем кеше версия хранится бессрочно. В кеше процесса смена версии
+    не видна другим воркерам, поэтому версия живет CATALOG_CACHE_TIMEOUT
+    секунд: дольше этого воркер не отдает устаревший справочник.
+    """
+    if is_cache_shared():
+        return None
+    return settings.CATALOG_CACHE_TIMEOUT
+
+
+def get_catalog_version(catalog):
+    """
+    Функция, возвращающая версию справочника.
+    Версия — время последнего изменения справочника в миллисекундах.
+    """
+    key = get_catalog_version_key(catalog)
+    version = cache.get(key)
+    if version is None:
+        cache.add(
+            key, time.time_ns() // 1_000_000, get_catalog_version_timeout()
+        )
+        version = cache.get(key)
+    return version
+
+
+def bump_catalog_version(catalog):
+    """
+    Функция, меняющая версию справочника.
+    Ранее отрендеренные ответы после этого не используются.
+    """
+    cache.set(
+        get_catalog_version_key(catalog), time.time_ns() // 1_000_000,
+        get_catalog_version_timeout()
+    )
+
+
+def get_catalog_data(catalog, name, get_data):
+    """
+    Функция, возвращающая производные данные справочника (например,
+    отображение слагов в id). Данные хранятся в кеше под текущей
+    версией справочника и сбрасываются вместе с ним.
+    """
+    key = f'catalog_data:{catalog}:{get_catalog_version(catalog)}:{name}'
+    data = cache.get(key)
+    if data is None:
+        data = get_data()
+        cache.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
+    return data
+
+
+def get_rendered_catalog_key(catalog, version, variant):
+    variant_hash = hashlib.md5(variant.encode()).hexdigest()
+    return f'catalog:{catalog}:{version}:{variant_hash}'
+
+
+def get_rendered_catalog(catalog, get_data, variant=''):
+    """
+    Функция, возвращающая отрендеренный JSON справочника, его gzip-версию,
+    ETag и время изменения. Результат хранится в кеше под текущей
+    версией справочника.
+    """
+    version = get_catalog_version(catalog)
+    key = get_rendered_catalog_key(catalog, version, variant)
+    rendered = cache.get(key)
+    if rendered is None:
+        body = JSONRenderer().render(get_data())
+        rendered = {
+            'body': body,
+            'gzip': gzip.compress(body),
+            'etag': f'"{hashlib.md5(body).hexdigest()}"',
+            'last_modified': version / 1000
+        }
+        cache.set(key, rendered, settings.CATALOG_CACHE_TIMEOUT)
+    return rendered
+
+
+async def aget_rendered_catalog(catalog, get_data, variant=''):
+    """
+    Асинхронная версия get_rendered_catalog. Если ответ уже есть в кеше,
+    он читается без перехода в синхронный поток.
+    """
+    version = await cache.aget(get_catalog_version_key(catalog))
+    if version is not None:
+        rendered = await cache.aget(
+            get_rendered_catalog_key(catalog, version, variant)
+        )
+        if rendered is not None:
+            return rendered
+    return await sync_to_async(get_rendered_catalog)(
+        catalog, get_data, variant
+    )
+
+
+def get_catalog_response(request, catalog, get_data, variant=''):
+    """
+    Функция, возвращающая ответ со справочником с заголовками ETag
+    и Last-Modified. На условный запрос с совпадающим If-None-Match
+    возвращается 304.
+    """
+    return make_catalog_response(
+        request, get_rendered_catalog(catalog, get_data, variant)
+    )
+
+
+def make_catalog_response(request, rendered):
+    """
+    Функция, возвращающая ответ со справочником в gzip, если клиент его
+    принимает. У каждого варианта кодирования свой ETag: к ETag
+    gzip-версии добавляется суффикс -gz.
+    """
+    use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    etag = rendered['etag']
+    if use_gzip:
+        etag = f'{etag[:-1]}-gz"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(rendered['last_modified'])
+    )
+    if response is None:
+        if use_gzip:
+            response = HttpResponse(
+                rendered['gzip'], content_type='application/json'
+            )
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(
+                rendered['body'], content_type='application/json'
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(rendered['last_modified'])
+    patch_vary_headers(response, ('Accept-Encoding',))
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from threading import BoundedSemaphore
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count
+
+from .models import Recipe, TimelineEntry
+from users.models import Subscription
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PULL_AUTHORS_CACHE_KEY = 'feed_pull_authors'
+FEED_MAX_LIMIT = 100
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.FEED_FANOUT_WORKERS,
+    thread_name_prefix='feed-fanout'
+)
+_slots = BoundedSemaphore(
+    settings.FEED_FANOUT_WORKERS + settings.FEED_FANOUT_QUEUE_SIZE
+)
+
+
+def get_pull_author_ids():
+    """
+    Функция, возвращающая множество id авторов, у которых подписчиков
+    не меньше FEED_PULL_FOLLOWERS_THRESHOLD. Их рецепты не рассылаются
+    по лентам, а подмешиваются при чтении.
+    """
+    author_ids = cache.get(PULL_AUTHORS_CACHE_KEY)
+    if author_ids is None:
+        author_ids = frozenset(
+            Subscription.objects.values('author').annotate(
+                followers=Count('id')
+            ).filter(
+                followers__gte=settings.FEED_PULL_FOLLOWERS_THRESHOLD
+            ).values_list('author', flat=True)
+        )
+        cache.set(
+            PULL_AUTHORS_CACHE_KEY, author_ids, settings.FEED_PULL_AUTHORS_TTL
+        )
+    return author_ids
+
+
+def update_pull_authors(author_id):
+    """
+    Функция, сбрасывающая кеш авторов с чтением ленты при запросе,
+    если число подписчиков автора пересекло порог
+    FEED_PULL_FOLLOWERS_THRESHOLD.
+    """
+    is_pull_author = Subscription.objects.filter(
+        author_id=author_id
+    ).count() >= settings.FEED_PULL_FOLLOWERS_THRESHOLD
+    if is_pull_author != (author_id in get_pull_author_ids()):
+        cache.delete(PULL_AUTHORS_CACHE_KEY)
+
+
+def forget_feed_user(user_id):
+    """
+    Функция, вызываемая перед удалением пользователя. Записи лент
+    удаляются каскадом по user и author, а кеш авторов с чтением ленты
+    при запросе сбрасывается после коммита, если пользователь сам
+    такой автор или подписан на такого автора.
+    """
+    pull_author_ids = get_pull_author_ids()
+    if user_id in pull_author_ids or Subscription.objects.filter(
+        user_id=user_id, author_id__in=pull_author_ids
+    ).exists():
+        transaction.on_commit(lambda: cache.delete(PULL_AUTHORS_CACHE_KEY))
+
+
+def fan_out_recipe(recipe_id):
+    """
+    Функция, добавляющая рецепт в ленты подписчиков автора пачками.
+    Для авторов из get_pull_author_ids ничего не делает: их рецепты
+    подмешиваются при чтении по тому же множеству.
+    """
+    author_id = Recipe.objects.filter(id=recipe_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None or author_id in get_pull_author_ids():
+        return
+    followers = Subscription.objects.filter(author_id=author_id)
+    batch_size = settings.FEED_FANOUT_BATCH_SIZE
+    user_ids = followers.order_by().values_list('user_id', flat=True).iterator(
+        chunk_size=batch_size
+    )
+    while batch := list(islice(user_ids, batch_size)):
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(
+                    user_id=user_id, recipe_id=recipe_id, author_id=author_id
+                ) for user_id in batch
+            ),
+            ignore_conflicts=True
+        )
+
+
+def _run(recipe_id):
+    try:
+        fan_out_recipe(recipe_id)
+    except Exception:
+        logger.exception('Ошибка рассылки рецепта %s по лентам', recipe_id)
+    finally:
+        connections.close_all()
+        _slots.release()
+
+
+def schedule_fan_out(recipe_id):
+    """
+    Функция, ставящая рассылку рецепта по лентам в очередь пула.
+    Если очередь заполнена, рассылка выполняется в текущем потоке.
+    """
+    if _slots.acquire(blocking=False):
+        _executor.submit(_run, recipe_id)
+    else:
+        fan_out_recipe(recipe_id)
+
+
+def backfill_timeline(user_id, author_id):
+    """
+    Функция, добавляющая в ленту пользователя последние
+    FEED_BACKFILL_SIZE рецептов автора, на которого он подписался.
+    """
+    if author_id in get_pull_author_ids():
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=user_id, recipe_id=recipe_id, author_id=author_id
+            )
+            for recipe_id in Recipe.objects.filter(
+                author_id=author_id
+            ).order_by('-id').values_list(
+                'id', flat=True
+            )[:settings.FEED_BACKFILL_SIZE]
+        ),
+        ignore_conflicts=True
+    )
+
+
+def trim_timeline(user_id, author_id):
+    """Функция, удаляющая из ленты пользователя рецепты автора."""
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def get_feed_recipe_ids(user, before=None, limit=10):
+    """
+    Функция, возвращающая id рецептов страницы ленты по убыванию
+    и id, с которого начинается следующая страница, или None.
+    Записи ленты объединяются с последними рецептами популярных
+    авторов, на которых подписан пользователь.
+    """
+    timeline = TimelineEntry.objects.filter(user=user)
+    if before is not None:
+        timeline = timeline.filter(recipe_id__lt=before)
+    recipe_ids = set(
+        timeline.order_by('-recipe_id').values_list(
+            'recipe_id', flat=True
+        )[:limit + 1]
+    )
+    pull_author_ids = get_pull_author_ids()
+    if pull_author_ids:
+        pull_author_ids = pull_author_ids.intersection(
+            Subscription.objects.filter(user=user).values_list(
+                'author_id', flat=True
+            )
+        )
+    if pull_author_ids:
+        pulled = Recipe.objects.filter(author_id__in=pull_author_ids)
+        if before is not None:
+            pulled = pulled.filter(id__lt=before)
+        recipe_ids.update(
+            pulled.order_by('-id').values_list('id', flat=True)[:limit + 1]
+        )
+    recipe_ids = sorted(recipe_ids, reverse=True)
+    if len(recipe_ids) > limit:
+        return recipe_ids[:limit], recipe_ids[limit - 1]
+    return recipe_ids, None
@@ -1,41 +1,70 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
 from django_filters import FilterSet
-from django_filters import (CharFilter, NumberFilter)
+from django_filters import (CharFilter, Filter, NumberFilter)
+from django_filters.widgets import QueryArrayWidget
 
-from .models import Ingredient, Recipe
+from .catalog import get_catalog_data
+from .models import Recipe, RecipeTag, Tag
+from .search import search_recipes
 
 
 User = get_user_model()
 
 
-class IngredientFilter(FilterSet):
-    """Класс, отвечающий за фильтрацию ингредиентов."""
-    name = CharFilter(lookup_expr='istartswith')
-
-    class Meta:
-        model = Ingredient
-        fields = ('name',)
-
-
 class RecipeFilter(FilterSet):
     """
     Класс, отвечающий за фильтрацию рецептов по параметрам запроса.
     """
     is_favorited = NumberFilter(method='get_is_favorited')
     is_in_shopping_cart = NumberFilter(method='get_is_in_shopping_cart')
-    tags = CharFilter(
-        field_name='tags__slug', lookup_expr='exact', method='filter_by_tags'
-    )
+    tags = Filter(method='filter_by_tags', widget=QueryArrayWidget)
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags')
+        fields = ('author', 'tags', 'search')
 
     def get_is_favorited(self, queryset, name, value):
+        if not value:
+            return queryset
+        if not self.request.user.is_authenticated:
+            return queryset.none()
         return queryset.filter(favorites__user=self.request.user)
 
     def get_is_in_shopping_cart(self, queryset, name, value):
+        if not value:
+            return queryset
+        if not self.request.user.is_authenticated:
+            return queryset.none()
         return queryset.filter(shopping_carts__user=self.request.user)
 
     def filter_by_tags(self, queryset, name, value):
-        return queryset.filter(tags__slug=value)
+        """
+        Метод, оставляющий рецепты хотя бы с одним из указанных тегов.
+        Слаги переводятся в id по кешу справочника тегов, фильтр
+        выполняется подзапросом EXISTS, поэтому дубликатов нет.
+        """
+        tag_ids_by_slug = get_catalog_data(
+            'tags', 'ids_by_slug',
+            lambda: dict(Tag.objects.values_list('slug', 'id'))
+        )
+        tag_ids = [
+            tag_ids_by_slug[slug] for slug in value if slug in tag_ids_by_slug
+        ]
+        if not tag_ids:
+            return queryset.none()
+        return queryset.filter(Exists(RecipeTag.objects.filter(
+            recipe_id=OuterRef('pk'), tag_id__in=tag_ids
+        )))
+
+    def filter_search(self, queryset, name, value):
+        """
+        Метод, оставляющий рецепты, подходящие под строку поиска,
+        по убыванию релевантности. В курсорном режиме пагинатор
+        упорядочивает рецепты по -id, и порядок по релевантности теряется.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
+        return search_recipes(queryset, value)
@@ -0,0 +1,10 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 с числом итераций из PASSWORD_PBKDF2_ITERATIONS.
+    При изменении числа итераций пароли пересчитываются при входе.
+    """
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
@@ -0,0 +1,271 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from threading import BoundedSemaphore
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection, connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Recipe
+
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+BASE64_CHUNK_SIZE = 64 * 1024
+
+ORIGINAL_OPTIONS = {'JPEG': {'quality': 90}, 'WEBP': {'quality': 90}}
+THUMBNAIL_FORMATS = {
+    'thumbnail': ('JPEG', 'jpg', {'quality': 82, 'optimize': True}),
+    'thumbnail_webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_PROCESSING_WORKERS,
+    thread_name_prefix='image-processing'
+)
+_slots = BoundedSemaphore(
+    settings.IMAGE_PROCESSING_WORKERS + settings.IMAGE_PROCESSING_QUEUE_SIZE
+)
+
+
+def encode_image(image, image_format, **options):
+    """
+    Функция, кодирующая изображение заново.
+    Метаданные (EXIF и прочие) при этом не сохраняются.
+    """
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def overwrite_file(storage, name, content):
+    """
+    Функция, перезаписывающая файл хранилища под тем же именем.
+    В файловом хранилище файл подменяется атомарно, поэтому по его URL
+    не бывает ни 404, ни недописанного файла. Возвращает имя файла.
+    """
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        storage.delete(name)
+        return storage.save(name, ContentFile(content))
+    directory, filename = os.path.split(path)
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=f'.{filename}.', delete=False
+    ) as file:
+        file.write(content)
+    os.chmod(file.name, storage.file_permissions_mode or 0o644)
+    os.replace(file.name, path)
+    return name
+
+
+def open_image(file, max_pixels):
+    """
+    Функция, открывающая изображение без декодирования пикселей
+    и проверяющая по заголовку, что в нем не больше max_pixels пикселей.
+    """
+    try:
+        image = Image.open(file)
+    except (OSError, Image.DecompressionBombError):
+        raise ValueError('Файл не является изображением.')
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ValueError(f'Изображение больше {max_pixels} пикселей.')
+    return image
+
+
+def process_recipe_image(recipe_id):
+    """
+    Функция, проверяющая изображение рецепта, удаляющая из него
+    метаданные и создающая миниатюры фиксированного размера.
+    Оригинал перезаписывается под тем же именем, чтобы выданные
+    клиентам ссылки на него оставались рабочими. Миниатюры называются
+    по id рецепта и хешу содержимого.
+    Если за время обработки изображение рецепта сменилось,
+    миниатюры отбрасываются.
+    """
+    recipe = Recipe.objects.filter(id=recipe_id).values(
+        'image', *THUMBNAIL_FORMATS
+    ).first()
+    if recipe is None or not recipe['image']:
+        return
+    storage = Recipe._meta.get_field('image').storage
+    source_name = recipe['image']
+    try:
+        with storage.open(source_name) as file:
+            image = open_image(file, settings.RECIPE_MAX_PIXELS)
+            image_format = image.format
+            image.load()
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        logger.warning(
+            'Некорректное изображение рецепта %s: %s', recipe_id, error
+        )
+        return
+    image = ImageOps.exif_transpose(image)
+    content = encode_image(
+        image, image_format, **ORIGINAL_OPTIONS.get(image_format, {})
+    )
+    new_names = {'image': overwrite_file(storage, source_name, content)}
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    thumbnail = ImageOps.fit(
+        image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB'),
+        settings.RECIPE_THUMBNAIL_SIZE,
+        Image.LANCZOS
+    )
+    for field, (image_format, ext, options) in THUMBNAIL_FORMATS.items():
+        name = f'recipes/thumbnails/{recipe_id}_{digest}.{ext}'
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(
+                encode_image(thumbnail, image_format, **options)
+            ))
+        new_names[field] = name
+
+    updated = Recipe.objects.filter(
+        id=recipe_id, image=source_name
+    ).update(**new_names)
+    if updated:
+        stale_names = {recipe[field] for field in THUMBNAIL_FORMATS}
+        in_use = new_names
+    else:
+        stale_names = {new_names[field] for field in THUMBNAIL_FORMATS}
+        in_use = Recipe.objects.filter(id=recipe_id).values(
+            *THUMBNAIL_FORMATS
+        ).first() or {}
+    for name in stale_names - set(in_use.values()):
+        if name:
+            storage.delete(name)
+
+
+def _run(recipe_id):
+    try:
+        process_recipe_image(recipe_id)
+    except Exception:
+        logger.exception('Ошибка обработки изображения рецепта %s', recipe_id)
+    finally:
+        connections.close_all()
+        _slots.release()
+
+
+def schedule_recipe_image_processing(recipe_id):
+    """
+    Функция, ставящая обработку изображения рецепта в очередь пула.
+    Если очередь заполнена, задача отбрасывается, чтобы не нагружать
+    поток запроса: рецепт остается с исходным изображением без миниатюр.
+    """
+    if _slots.acquire(blocking=False):
+        _executor.submit(_run, recipe_id)
+    else:
+        logger.warning(
+            'Очередь обработки изображений заполнена, рецепт %s '
+            'остается без миниатюр', recipe_id
+        )
+
+
+def decode_base64_image(data, max_size):
+    """
+    Функция, декодирующая изображение из data URL частями.
+    Размер проверяется до декодирования, результат не может
+    превысить max_size байт.
+    """
+    if not isinstance(data, str) or not data.startswith('data:image/'):
+        raise ValueError('Ожидалось изображение в формате base64.')
+    _, separator, payload = data.partition(';base64,')
+    if not separator or not payload:
+        raise ValueError('Ожидалось изображение в формате base64.')
+    if len(payload) // 4 * 3 > max_size + 2:
+        raise ValueError(
+            f'Размер изображения превышает {max_size // 1024} КБ.'
+        )
+    buffer = BytesIO()
+    try:
+        for start in range(0, len(payload), BASE64_CHUNK_SIZE):
+            buffer.write(base64.b64decode(
+                payload[start:start + BASE64_CHUNK_SIZE], validate=True
+            ))
+    except binascii.Error:
+        raise ValueError('Некорректные данные base64.')
+    if buffer.tell() > max_size:
+        raise ValueError(
+            f'Размер изображения превышает {max_size // 1024} КБ.'
+        )
+    buffer.seek(0)
+    return buffer
+
+
+@contextmanager
+def lock_avatar_file(name):
+    """
+    Контекстный менеджер, открывающий транзакцию с блокировкой файла
+    аватара. Проверка ссылок на файл и его запись или удаление
+    в параллельных запросах не перемешиваются. В PostgreSQL используется
+    advisory-блокировка до конца транзакции, в SQLite запись
+    в БД и так выполняется по одной транзакции.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(hashtext(%s))', (name,)
+                )
+        yield
+
+
+def _delete_avatar_if_unused(name):
+    with lock_avatar_file(name):
+        if not User.objects.filter(avatar=name).exists():
+            User._meta.get_field('avatar').storage.delete(name)
+
+
+def delete_unused_avatar(name):
+    """
+    Функция, удаляющая файл аватара после коммита,
+    если на него больше не ссылается ни один пользователь.
+    """
+    if name:
+        transaction.on_commit(lambda: _delete_avatar_if_unused(name))
+
+
+def save_avatar(user, data):
+    """
+    Функция, сохраняющая аватар пользователя.
+    Изображение уменьшается до AVATAR_SIZE и сохраняется под именем,
+    равным хешу содержимого, поэтому одинаковые аватары хранятся
+    в одном файле. Предыдущий файл удаляется.
+    """
+    buffer = decode_base64_image(data, settings.AVATAR_MAX_UPLOAD_SIZE)
+    image = open_image(buffer, settings.AVATAR_MAX_PIXELS)
+    try:
+        image.load()
+    except (OSError, Image.DecompressionBombError):
+        raise ValueError('Файл не является изображением.')
+    image = ImageOps.fit(
+        ImageOps.exif_transpose(image).convert('RGB'),
+        settings.AVATAR_SIZE,
+        Image.LANCZOS
+    )
+    content = encode_image(image, 'JPEG', quality=85, optimize=True)
+    digest = hashlib.sha256(content).hexdigest()
+    name = f'avatars/{digest[:2]}/{digest}.jpg'
+    storage = User._meta.get_field('avatar').storage
+    previous_name = user.avatar.name
+    with lock_avatar_file(name):
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(content))
+        user.avatar.name = name
+        user.save(update_fields=('avatar',))
+    if previous_name != name:
+        delete_unused_avatar(previous_name)
+    return user.avatar
@@ -0,0 +1,95 @@
+from bisect import bisect_left
+from threading import Lock
+
+from django.conf import settings
+from django.db.models import Count
+
+from .catalog import get_catalog_version
+from .models import Ingredient
+
+import time
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса для автодополнения.
+    Хранит отсортированный массив названий и отдает сначала совпадения
+    по префиксу, затем по подстроке. Внутри каждой группы ингредиенты
+    упорядочены по частоте использования в рецептах.
+    """
+    __slots__ = ('keys', 'entries', 'usage', 'built_at', 'version')
+
+    def __init__(self, rows, version=None):
+        rows = sorted(rows, key=lambda row: (row[1].lower(), row[0]))
+        self.keys = [name.lower() for _, name, _, _ in rows]
+        self.entries = [
+            {'id': pk, 'name': name, 'measurement_unit': unit}
+            for pk, name, unit, _ in rows
+        ]
+        self.usage = [usage for _, _, _, usage in rows]
+        self.built_at = time.monotonic()
+        self.version = version
+
+    @classmethod
+    def build(cls, version=None):
+        return cls(
+            Ingredient.objects.annotate(
+                usage=Count('recipeingredients')
+            ).values_list('id', 'name', 'measurement_unit', 'usage'),
+            version
+        )
+
+    def is_fresh(self, version):
+        ttl = getattr(settings, 'INGREDIENT_INDEX_TTL', 300)
+        return (
+            self.version == version
+            and time.monotonic() - self.built_at < ttl
+        )
+
+    def _rank(self, positions, query):
+        positions.sort(
+            key=lambda position: (
+                self.keys[position] != query, -self.usage[position]
+            )
+        )
+        return [self.entries[position] for position in positions]
+
+    def search(self, query):
+        """
+        Метод, возвращающий ингредиенты, подходящие под запрос.
+        """
+        query = query.strip().lower()
+        if not query:
+            return sorted(self.entries, key=lambda entry: entry['id'])
+        start = bisect_left(self.keys, query)
+        end = start
+        while end < len(self.keys) and self.keys[end].startswith(query):
+            end += 1
+        prefix = list(range(start, end))
+        substring = [
+            position for position, key in enumerate(self.keys)
+            if (position < start or position >= end) and query in key
+        ]
+        return self._rank(prefix, query) + self._rank(substring, query)
+
+
+_index = None
+_lock = Lock()
+
+
+def get_ingredient_index():
+    """
+    Функция, возвращающая индекс ингредиентов текущего процесса.
+    Индекс привязан к версии справочника ингредиентов: он перестраивается,
+    когда версия в кеше меняется после изменения ингредиентов в любом
+    воркере, или по истечении INGREDIENT_INDEX_TTL секунд.
+    """
+    global _index
+    version = get_catalog_version('ingredients')
+    index = _index
+    if index is not None and index.is_fresh(version):
+        return index
+    with _lock:
+        if _index is None or not _index.is_fresh(version):
+            _index = IngredientIndex.build(version)
+        return _index
@@ -0,0 +1,145 @@
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from backend_foodgram.catalog import bump_catalog_version
+from backend_foodgram.models import Ingredient
+
+import csv
+import json
+import time
+
+NAME_MAX_LENGTH = Ingredient._meta.get_field('name').max_length
+UNIT_MAX_LENGTH = Ingredient._meta.get_field('measurement_unit').max_length
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def iter_csv(file):
+    """Генератор пар (название, мера измерения) из CSV-файла."""
+    for line_number, row in enumerate(csv.reader(file), start=1):
+        if not row:
+            continue
+        if len(row) != 2:
+            raise CommandError(
+                f'Строка {line_number}: ожидалось 2 колонки, '
+                f'получено {len(row)}.'
+            )
+        yield line_number, row[0], row[1]
+
+
+def iter_json(file):
+    """
+    Генератор пар (название, мера измерения) из JSON-массива объектов.
+    Файл читается частями, объекты разбираются по одному.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    number = 0
+    for chunk in iter(lambda: file.read(JSON_CHUNK_SIZE), ''):
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and (
+                buffer[position].isspace() or buffer[position] == ','
+            ):
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise CommandError('Ожидался JSON-массив.')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            number += 1
+            if not isinstance(item, dict):
+                raise CommandError(f'Объект {number}: ожидался словарь.')
+            try:
+                yield number, item['name'], item['measurement_unit']
+            except KeyError as error:
+                raise CommandError(f'Объект {number}: нет поля {error}.')
+        buffer = buffer[position:]
+    raise CommandError('Некорректный JSON: массив не закрыт.')
+
+
+def iter_ingredients(rows):
+    for number, name, measurement_unit in rows:
+        if not isinstance(name, str) or not isinstance(measurement_unit, str):
+            raise CommandError(
+                f'Запись {number}: значения должны быть строками.'
+            )
+        name, measurement_unit = name.strip(), measurement_unit.strip()
+        if not name or not measurement_unit:
+            raise CommandError(f'Запись {number}: пустое значение.')
+        if (
+            len(name) > NAME_MAX_LENGTH
+            or len(measurement_unit) > UNIT_MAX_LENGTH
+        ):
+            raise CommandError(f'Запись {number}: слишком длинное значение.')
+        yield Ingredient(name=name, measurement_unit=measurement_unit)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты из CSV или JSON пачками. '
+        'Уже существующие ингредиенты пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?',
+            default=settings.DATAFILES_DIR / 'ingredients.csv',
+            help='Путь к файлу с ингредиентами.'
+        )
+        parser.add_argument(
+            '--format', choices=('csv', 'json'),
+            help='Формат файла. По умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одной пачке.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'json'):
+            raise CommandError(f'Неизвестный формат файла: {path}.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        reader = iter_csv if file_format == 'csv' else iter_json
+
+        started = time.perf_counter()
+        total = 0
+        count_before = Ingredient.objects.count()
+        try:
+            with open(path, encoding='utf-8') as file, transaction.atomic():
+                ingredients = iter_ingredients(reader(file))
+                while batch := list(
+                    islice(ingredients, options['batch_size'])
+                ):
+                    Ingredient.objects.bulk_create(
+                        batch, ignore_conflicts=True
+                    )
+                    total += len(batch)
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+        created = Ingredient.objects.count() - count_before
+
+        bump_catalog_version('ingredients')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {total} строк, добавлено {created} ингредиентов '
+            f'за {elapsed:.2f} с ({total / elapsed if elapsed else 0:.0f} '
+            f'строк/с).'
+        ))
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from backend_foodgram.models import Favorite, Recipe
+
+User = get_user_model()
+
+
+def count_subquery(model, field):
+    """
+    Функция, возвращающая подзапрос с числом строк model,
+    ссылающихся на текущую запись через field.
+    """
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('id')).values('total')
+    ), 0)
+
+
+def recount(model, counter, actual, batch_size):
+    """
+    Функция, исправляющая расхождения счетчика counter пачками по id.
+    Возвращает число исправленных строк.
+    """
+    fixed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            model.objects.filter(id__gt=last_id).order_by('id').values_list(
+                'id', flat=True
+            )[:batch_size]
+        )
+        if not ids:
+            return fixed
+        last_id = ids[-1]
+        drifted = model.objects.filter(id__in=ids).annotate(
+            actual=actual
+        ).exclude(**{counter: F('actual')}).values_list('id', flat=True)
+        fixed += model.objects.filter(id__in=list(drifted)).update(
+            **{counter: actual}
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счетчики: число добавлений '
+        'рецептов в избранное и число рецептов пользователей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Количество строк, проверяемых за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        for model, counter, actual in (
+            (Recipe, 'favorites_count', count_subquery(Favorite, 'recipe')),
+            (User, 'recipes_count', count_subquery(Recipe, 'author')),
+        ):
+            fixed = recount(model, counter, actual, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: исправлено '
+                f'{fixed} значений {counter}.'
+            ))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:53
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_short_links(apps, schema_editor):
+    RecipeShortLink = apps.get_model('backend_foodgram', 'RecipeShortLink')
+    first_ids = RecipeShortLink.objects.values('recipe').annotate(
+        first_id=Min('id')
+    ).values('first_id')
+    RecipeShortLink.objects.exclude(id__in=first_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_foodgram', '0004_alter_favorite_options_alter_ingredient_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='recipeshortlink',
+            name='unique_recipeshortlink_recipe_shortlink',
+        ),
+        migrations.AlterField(
+            model_name='recipeshortlink',
+            name='short_link',
+            field=models.CharField(max_length=16, unique=True),
+        ),
+        migrations.RunPython(
+            remove_duplicate_short_links, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='recipeshortlink',
+            constraint=models.UniqueConstraint(fields=('recipe',), name='unique_recipeshortlink_recipe'),
+        ),
+    ]
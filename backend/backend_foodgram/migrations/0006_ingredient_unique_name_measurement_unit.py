@@ -0,0 +1,48 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:57
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('backend_foodgram', 'Ingredient')
+    RecipeIngredient = apps.get_model('backend_foodgram', 'RecipeIngredient')
+    duplicates = Ingredient.objects.values(
+        'name', 'measurement_unit'
+    ).annotate(first_id=Min('id'), total=Count('id')).filter(total__gt=1)
+    for duplicate in duplicates:
+        first_id = duplicate['first_id']
+        extra_ids = Ingredient.objects.filter(
+            name=duplicate['name'],
+            measurement_unit=duplicate['measurement_unit']
+        ).exclude(id=first_id).values_list('id', flat=True)
+        for recipe_ingredient in RecipeIngredient.objects.filter(
+            ingredient_id__in=extra_ids
+        ):
+            if RecipeIngredient.objects.filter(
+                recipe_id=recipe_ingredient.recipe_id,
+                ingredient_id=first_id,
+                amount=recipe_ingredient.amount
+            ).exists():
+                recipe_ingredient.delete()
+            else:
+                recipe_ingredient.ingredient_id = first_id
+                recipe_ingredient.save(update_fields=('ingredient',))
+        Ingredient.objects.filter(id__in=list(extra_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_foodgram', '0005_recipeshortlink_unique_recipe'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient_name_measurement_unit'),
+        ),
+    ]
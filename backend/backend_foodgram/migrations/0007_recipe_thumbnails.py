@@ -0,0 +1,23 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_foodgram', '0006_ingredient_unique_name_measurement_unit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='recipes/thumbnails/', verbose_name='Миниатюра'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='thumbnail_webp',
+            field=models.ImageField(blank=True, null=True, upload_to='recipes/thumbnails/', verbose_name='Миниатюра WebP'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.17 on 2026-10-18 21:40
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FTS_TABLE = 'backend_foodgram_recipe_fts'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX recipe_search_vector_gin '
+            'ON backend_foodgram_recipe USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            "UPDATE backend_foodgram_recipe SET search_vector = "
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(text, '')), 'B')"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(name, text)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, text) '
+            f'SELECT id, name, text FROM backend_foodgram_recipe'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS recipe_search_vector_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_foodgram', '0007_recipe_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
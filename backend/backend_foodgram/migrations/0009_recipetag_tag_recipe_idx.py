@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_foodgram', '0008_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipetag',
+            index=models.Index(fields=['tag', 'recipe'], name='recipetag_tag_recipe_idx'),
+        ),
+    ]
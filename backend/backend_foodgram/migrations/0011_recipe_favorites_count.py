@@ -0,0 +1,38 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:13
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('id')).values('total')
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model('backend_foodgram', 'Recipe')
+    Favorite = apps.get_model('backend_foodgram', 'Favorite')
+    User = apps.get_model('users', 'User')
+    Recipe.objects.update(favorites_count=count_subquery(Favorite, 'recipe'))
+    User.objects.update(recipes_count=count_subquery(Recipe, 'author'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_foodgram', '0010_recipe_author_id_idx'),
+        ('users', '0005_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='В избранном'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
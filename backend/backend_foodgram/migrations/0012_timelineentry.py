@@ -0,0 +1,69 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:16
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+# Значения настроек на момент создания миграции: результат миграции
+# не должен зависеть от окружения, в котором она применяется.
+FEED_BACKFILL_SIZE = 100
+FEED_PULL_FOLLOWERS_THRESHOLD = 10000
+
+
+def fill_timelines(apps, schema_editor):
+    Subscription = apps.get_model('users', 'Subscription')
+    Recipe = apps.get_model('backend_foodgram', 'Recipe')
+    TimelineEntry = apps.get_model('backend_foodgram', 'TimelineEntry')
+    pull_author_ids = Subscription.objects.values('author').annotate(
+        followers=Count('id')
+    ).filter(
+        followers__gte=FEED_PULL_FOLLOWERS_THRESHOLD
+    ).values('author')
+    for user_id, author_id in Subscription.objects.exclude(
+        author_id__in=pull_author_ids
+    ).values_list('user_id', 'author_id').iterator():
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(
+                    user_id=user_id, recipe_id=recipe_id, author_id=author_id
+                )
+                for recipe_id in Recipe.objects.filter(
+                    author_id=author_id
+                ).order_by('-id').values_list(
+                    'id', flat=True
+                )[:FEED_BACKFILL_SIZE]
+            ),
+            ignore_conflicts=True
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('backend_foodgram', '0011_recipe_favorites_count'),
+        ('users', '0005_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='backend_foodgram.recipe')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+                'indexes': [models.Index(fields=['user', 'author'], name='timeline_user_author_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_timelineentry_user_recipe'),
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend_foodgram', '0012_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+    ]
@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models import (
     Model, CharField, SlugField, ManyToManyField, TextField,
     IntegerField, ImageField, ForeignKey, CASCADE, UniqueConstraint,
-    FloatField
+    FloatField, QuerySet, Exists, OuterRef, Prefetch, Value, BooleanField,
+    Index, PositiveIntegerField
 )
 
+from users.models import CountersMixin, Subscription
+
 User = get_user_model()
 
 
@@ -37,11 +41,70 @@ class Ingredient(Model):
         return self.name
 
     class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=('name', 'measurement_unit'),
+                name='unique_ingredient_name_measurement_unit'
+            )
+        ]
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
 
 
-class Recipe(Model):
+class RecipeQuerySet(QuerySet):
+    """
+    QuerySet рецептов с заранее подгруженными связанными объектами.
+    """
+    def with_related(self):
+        """
+        Подгружает автора, теги и ингредиенты рецептов
+        фиксированным числом запросов.
+        """
+        return self.select_related('author').defer(
+            'search_vector'
+        ).prefetch_related(
+            'tags',
+            Prefetch(
+                'recipeingredients',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                )
+            )
+        )
+
+    def with_user_flags(self, user):
+        """
+        Аннотирует рецепты флагами is_favorited, is_in_shopping_cart
+        и is_author_subscribed для переданного пользователя.
+        """
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(
+                    False, output_field=BooleanField()
+                ),
+                is_author_subscribed=Value(
+                    False, output_field=BooleanField()
+                )
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )
+            ),
+            is_author_subscribed=Exists(
+                Subscription.objects.filter(
+                    user=user, author=OuterRef('author')
+                )
+            )
+        )
+
+
+class Recipe(CountersMixin, Model):
     """
     Модель рецепта.
     """
@@ -56,11 +119,30 @@ class Recipe(Model):
     tags = ManyToManyField(Tag, through='RecipeTag')
     ingredients = ManyToManyField(Ingredient, through='RecipeIngredient')
     image = ImageField(upload_to='recipes/images/')
+    thumbnail = ImageField(
+        'Миниатюра', upload_to='recipes/thumbnails/', blank=True, null=True
+    )
+    thumbnail_webp = ImageField(
+        'Миниатюра WebP', upload_to='recipes/thumbnails/',
+        blank=True, null=True
+    )
+    favorites_count = PositiveIntegerField(
+        'В избранном', default=0, editable=False
+    )
+    # Заполняется в update_search_index, индекс создается миграцией.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
+    counter_fields = ('favorites_count',)
 
     def __str__(self):
         return self.name
 
     class Meta:
+        indexes = (
+            Index(fields=('author', '-id'), name='recipe_author_id_idx'),
+        )
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
 
@@ -76,6 +158,9 @@ class RecipeTag(Model):
         return f'{self.recipe} - {self.tag}'
 
     class Meta:
+        indexes = (
+            Index(fields=('tag', 'recipe'), name='recipetag_tag_recipe_idx'),
+        )
         verbose_name = 'Рецепт-Тег'
         verbose_name_plural = 'Рецепты-Теги'
 
@@ -166,14 +251,46 @@ class RecipeShortLink(Model):
     recipe = ForeignKey(
         Recipe, on_delete=CASCADE, related_name='fullrecipe'
     )
-    short_link = CharField(max_length=4, unique=True)
+    short_link = CharField(max_length=16, unique=True)
 
     class Meta:
         constraints = [
             UniqueConstraint(
-                fields=('recipe', 'short_link'),
-                name='unique_recipeshortlink_recipe_shortlink'
+                fields=('recipe',),
+                name='unique_recipeshortlink_recipe'
             ),
         ]
         verbose_name = 'Рецепт-Короткая ссылка'
         verbose_name_plural = 'Рецепты-Короткие ссылки'
+
+
+class TimelineEntry(Model):
+    """
+    Модель записи ленты подписок: рецепт автора,
+    на которого подписан пользователь.
+    """
+    user = ForeignKey(
+        User, on_delete=CASCADE, related_name='timeline'
+    )
+    recipe = ForeignKey(
+        Recipe, on_delete=CASCADE, related_name='timeline_entries'
+    )
+    author = ForeignKey(
+        User, on_delete=CASCADE, related_name='+'
+    )
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_timelineentry_user_recipe'
+            )
+        ]
+        indexes = (
+            Index(fields=('user', 'author'), name='timeline_user_author_idx'),
+        )
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+
+    def __str__(self):
+        return f'{self.recipe_id} в ленте {self.user_id}'
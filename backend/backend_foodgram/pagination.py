@@ -1,4 +1,9 @@
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import (
+    BasePagination, CursorPagination, PageNumberPagination
+)
 from rest_framework.response import Response
 
 
@@ -24,3 +29,98 @@ class PageLimitAndRecipesLimitPagination(PageLimitPagination):
                 "tags": self.request.query_params.get('tags')
             }
         )
+
+
+class CursorLimitPagination(CursorPagination):
+    """
+    Курсорный пагинатор по убыванию id без OFFSET.
+    Общее количество объектов считается только по запросу ?count=1,
+    иначе в ответе возвращается count: null.
+    """
+    ordering = '-id'
+    page_size_query_param = 'limit'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data
+            }
+        )
+
+
+class PageOrCursorPagination(BasePagination):
+    """
+    Пагинатор, выбирающий постраничный или курсорный режим
+    по параметрам запроса: по умолчанию постраничный,
+    курсорный включается параметром cursor (для первой страницы пустым).
+    """
+    page_pagination_class = PageLimitPagination
+    cursor_pagination_class = CursorLimitPagination
+
+    def get_paginator(self, request):
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_query_param in request.query_params:
+            return self.cursor_pagination_class()
+        return self.page_pagination_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class RecipesCursorPagination(CursorLimitPagination):
+    """
+    Курсорный пагинатор рецептов.
+    """
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['tags'] = self.request.query_params.get('tags')
+        return response
+
+
+class RecipePagination(PageOrCursorPagination):
+    """
+    Пагинатор списка рецептов: по умолчанию постраничный,
+    с параметром cursor — курсорный, без COUNT(*) и OFFSET.
+    """
+    page_pagination_class = PageLimitAndRecipesLimitPagination
+    cursor_pagination_class = RecipesCursorPagination
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админки для больших таблиц.
+    Для списка без фильтров в PostgreSQL число строк берется
+    из статистики pg_class вместо COUNT(*) по всей таблице.
+    """
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE oid = %s::regclass',
+                    (queryset.model._meta.db_table,)
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return row[0]
+        return super().count
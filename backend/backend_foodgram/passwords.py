@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework.exceptions import Throttled
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_CHECK_WORKERS,
+    thread_name_prefix='password-check'
+)
+_slots = BoundedSemaphore(
+    settings.PASSWORD_CHECK_WORKERS + settings.PASSWORD_CHECK_QUEUE_SIZE
+)
+
+
+def _verify(password, encoded):
+    new_encoded = []
+    is_correct = check_password(
+        password, encoded,
+        setter=lambda raw_password: new_encoded.append(
+            make_password(raw_password)
+        )
+    )
+    return is_correct, next(iter(new_encoded), None)
+
+
+def verify_user_password(user, password):
+    """
+    Функция, проверяющая пароль пользователя в ограниченном пуле потоков.
+    Если хеш создан устаревшим хешером или с другим числом итераций,
+    пароль пересчитывается и сохраняется.
+    Когда пул и очередь заняты, выбрасывается Throttled.
+    """
+    if not _slots.acquire(blocking=False):
+        raise Throttled(
+            wait=1, detail='Слишком много попыток входа, повторите позже.'
+        )
+    try:
+        is_correct, new_encoded = _executor.submit(
+            _verify, password, user.password
+        ).result()
+    finally:
+        _slots.release()
+    if new_encoded is not None:
+        user.password = new_encoded
+        user.save(update_fields=('password',))
+    return is_correct
@@ -0,0 +1,88 @@
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector
+)
+from django.db import connection
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+
+from .models import Recipe
+
+import re
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'backend_foodgram_recipe_fts'
+RECIPE_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('text', weight='B', config=SEARCH_CONFIG)
+)
+
+
+def update_search_index(recipe_ids):
+    """
+    Функция, обновляющая поисковый индекс рецептов.
+    В PostgreSQL пересчитывается колонка search_vector,
+    в SQLite — строки таблицы FTS5.
+    """
+    if connection.vendor == 'postgresql':
+        Recipe.objects.filter(id__in=recipe_ids).update(
+            search_vector=RECIPE_SEARCH_VECTOR
+        )
+    elif connection.vendor == 'sqlite':
+        placeholders = ', '.join(['%s'] * len(recipe_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                recipe_ids
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, text) '
+                f'SELECT id, name, text FROM {Recipe._meta.db_table} '
+                f'WHERE id IN ({placeholders})',
+                recipe_ids
+            )
+
+
+def delete_from_search_index(recipe_id):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (recipe_id,)
+            )
+
+
+def get_fts_query(query):
+    """
+    Функция, переводящая строку поиска в запрос FTS5:
+    все слова должны встретиться, каждое ищется по префиксу.
+    """
+    return ' '.join(
+        f'"{word}"*' for word in re.findall(r'\w+', query)
+    )
+
+
+def search_recipes(queryset, query):
+    """
+    Функция, оставляющая рецепты, подходящие под строку поиска,
+    и упорядочивающая их по релевантности.
+    Название весит больше описания.
+    """
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-id')
+    fts_query = get_fts_query(query)
+    if not fts_query:
+        return queryset.none()
+    # bm25 тем меньше, чем запись релевантнее; веса: название 10, описание 1.
+    return queryset.filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (fts_query,)
+    )).annotate(rank=RawSQL(
+        f'SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s '
+        f'AND rowid = {Recipe._meta.db_table}.id',
+        (fts_query,)
+    )).order_by('rank', '-id')
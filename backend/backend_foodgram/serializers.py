@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from rest_framework.serializers import (
     ModelSerializer, ImageField, IntegerField, PrimaryKeyRelatedField,
     CharField, Serializer, SerializerMethodField, ValidationError,
@@ -8,26 +9,33 @@ from rest_framework.serializers import (
 )
 from djoser.serializers import UserCreateSerializer, UserSerializer
 
+from .images import decode_base64_image, open_image
 from .models import (
     Tag, Ingredient, Recipe, RecipeIngredient,
     Favorite, ShoppingCart
 )
+from .utils import get_following_ids
 from users.models import Subscription
 
-import base64
-
 User = get_user_model()
 
 
 class Base64ImageField(ImageField):
     """
-    Полу для хранения изображений в формате base64.
+    Поле для хранения изображений рецептов в формате base64.
+    Размер данных и число пикселей проверяются до декодирования.
     """
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            fmt, imgstr = data.split(';base64,')
-            ext = fmt.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            ext = data.partition(';')[0].split('/')[-1]
+            try:
+                buffer = decode_base64_image(
+                    data, settings.RECIPE_IMAGE_MAX_UPLOAD_SIZE
+                )
+                open_image(buffer, settings.RECIPE_MAX_PIXELS)
+            except ValueError as error:
+                raise ValidationError(str(error))
+            data = ContentFile(buffer.getvalue(), name='temp.' + ext)
         return super().to_internal_value(data)
 
 
@@ -95,29 +103,71 @@ class RecipeCreateSerializer(ModelSerializer):
     def get_is_in_shopping_cart(self, obj):
         return False
 
+    def validate_ingredients(self, value):
+        """
+        Проверяет, что ингредиенты не повторяются и существуют.
+        Все ингредиенты загружаются одним запросом.
+        """
+        ids = [ingredient['id'] for ingredient in value]
+        if len(ids) != len(set(ids)):
+            raise ValidationError('Ингредиенты не должны повторяться.')
+        ingredients = Ingredient.objects.in_bulk(ids)
+        unknown_ids = [pk for pk in ids if pk not in ingredients]
+        if unknown_ids:
+            raise ValidationError(
+                'Ингредиенты не найдены: '
+                f'{", ".join(map(str, unknown_ids))}.'
+            )
+        return value
+
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('recipeingredients')
         tags_data = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient['id'],
+                amount=ingredient['amount']
+            ) for ingredient in ingredients_data
+        )
+        recipe.tags.set(tags_data)
+        return recipe
 
-        ingredients_list = []
-        for ingredient in ingredients_data:
-            ingredients_list.append(
+    def update_ingredients(self, instance, ingredients_data):
+        """
+        Приводит ингредиенты рецепта к переданному списку:
+        добавляет новые, меняет количество у изменившихся
+        и удаляет отсутствующие.
+        """
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients_data
+        }
+        to_update = []
+        to_delete = []
+        for recipe_ingredient in instance.recipeingredients.all():
+            amount = amounts.pop(recipe_ingredient.ingredient_id, None)
+            if amount is None:
+                to_delete.append(recipe_ingredient.id)
+            elif recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                to_update.append(recipe_ingredient)
+        if to_delete:
+            RecipeIngredient.objects.filter(id__in=to_delete).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ('amount',))
+        if amounts:
+            RecipeIngredient.objects.bulk_create(
                 RecipeIngredient(
-                    recipe=recipe,
-                    ingredient=get_object_or_404(
-                        Ingredient, id=ingredient.get('id')
-                    ),
-                    amount=ingredient.get('amount')
-                )
+                    recipe=instance, ingredient_id=pk, amount=amount
+                ) for pk, amount in amounts.items()
             )
-        RecipeIngredient.objects.bulk_create(ingredients_list)
-
-        recipe.tags.set(tags_data)
-        return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients_data = validated_data.pop('ingredients', None)
+        ingredients_data = validated_data.pop('recipeingredients', None)
         tags_data = validated_data.pop('tags', None)
 
         instance.name = validated_data.get('name', instance.name)
@@ -126,23 +176,13 @@ class RecipeCreateSerializer(ModelSerializer):
             'cooking_time', instance.cooking_time
         )
         instance.image = validated_data.pop('image', instance.image)
-        instance.save()
+        instance.save(update_fields=('name', 'text', 'cooking_time', 'image'))
 
         if tags_data is not None:
             instance.tags.set(tags_data)
 
         if ingredients_data is not None:
-            instance.recipeingredients.all().delete()
-            ingredients_list = [
-                RecipeIngredient(
-                    recipe=instance,
-                    ingredient=get_object_or_404(
-                        Ingredient, id=ingredient.get('id')
-                    ),
-                    amount=ingredient.get('amount')
-                ) for ingredient in ingredients_data
-            ]
-            RecipeIngredient.objects.bulk_create(ingredients_list)
+            self.update_ingredients(instance, ingredients_data)
         return instance
 
 
@@ -150,7 +190,10 @@ class RecipeShortSerializer(ModelSerializer):
     """Сериализатор для получения краткой информации о рецепте."""
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = (
+            'id', 'name', 'image', 'thumbnail', 'thumbnail_webp',
+            'cooking_time'
+        )
 
 
 class ShoppingCartSerializer(ModelSerializer):
@@ -209,17 +252,14 @@ class UserGETSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        return (
-            user.is_authenticated
-            and Subscription.objects.filter(user=user, author=obj).exists()
-        )
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        return obj.id in get_following_ids(self.context.get('request'))
 
 
 class UserSubscribeRepresentSerializer(UserGETSerializer):
     """Сериализатор для получения информации о подписках пользователя."""
     recipes = SerializerMethodField()
-    recipes_count = SerializerMethodField()
 
     class Meta:
         model = User
@@ -233,19 +273,18 @@ class UserSubscribeRepresentSerializer(UserGETSerializer):
         )
 
     def get_recipes(self, obj):
+        if hasattr(obj, 'limited_recipes'):
+            return RecipeShortSerializer(obj.limited_recipes, many=True).data
         request = self.context.get('request')
         recipes_limit = request.query_params.get('recipes_limit')
         recipes_limit = int(
             recipes_limit
         ) if recipes_limit is not None else None
-        recipes = obj.recipes.all()
+        recipes = obj.recipes.order_by('-id')
         if recipes_limit:
             recipes = recipes[:recipes_limit]
         return RecipeShortSerializer(recipes, many=True).data
 
-    def get_recipes_count(self, obj):
-        return len(obj.recipes.all())
-
 
 class UserSubscribeSerializer(ModelSerializer):
     """Сериализатор для подписки на пользователя."""
@@ -280,10 +319,18 @@ class RecipeGETSerializer(ModelSerializer):
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'is_favorited',
-            'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time'
+            'is_in_shopping_cart', 'name', 'image', 'thumbnail',
+            'thumbnail_webp', 'text', 'cooking_time'
         )
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'is_author_subscribed'):
+            instance.author.is_subscribed = instance.is_author_subscribed
+        return super().to_representation(instance)
+
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if request is not None:
             user_id = self.context.get('request').user.id
@@ -293,6 +340,8 @@ class RecipeGETSerializer(ModelSerializer):
         raise Exception('request is None')
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context.get('request')
         if request is not None:
             user_id = self.context.get('request').user.id
@@ -0,0 +1,188 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token
+from .catalog import bump_catalog_version
+from .feed import (
+    backfill_timeline, forget_feed_user, schedule_fan_out, trim_timeline,
+    update_pull_authors
+)
+from .images import schedule_recipe_image_processing
+from .models import Favorite, Ingredient, Recipe, RecipeShortLink, Tag
+from .search import delete_from_search_index, update_search_index
+from .utils import invalidate_short_link
+from users.models import Subscription
+
+User = get_user_model()
+
+
+def is_deleted_with(origin, model):
+    """
+    Функция, проверяющая, что удаление начато с объекта или queryset
+    модели model, то есть объект удаляется каскадно вместе с ним.
+    """
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, model)
+    return isinstance(origin, model)
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    """
+    После коммита меняет версию справочника ингредиентов: вместе с ней
+    сбрасываются кеш ответов и индексы автодополнения всех воркеров.
+    """
+    transaction.on_commit(lambda: bump_catalog_version('ingredients'))
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(sender, **kwargs):
+    """После коммита сбрасывает кеш справочника тегов."""
+    transaction.on_commit(lambda: bump_catalog_version('tags'))
+
+
+@receiver(post_delete, sender=RecipeShortLink)
+def short_link_deleted(sender, instance, **kwargs):
+    """
+    Удаляет короткую ссылку из кешей, в том числе при удалении рецепта.
+    """
+    invalidate_short_link(instance.short_link)
+
+
+@receiver(pre_save, sender=Recipe)
+def recipe_image_assigned(sender, instance, **kwargs):
+    """Запоминает, что рецепту загружено новое изображение."""
+    instance._image_changed = (
+        bool(instance.image) and not instance.image._committed
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    """
+    После коммита отправляет новое изображение рецепта в пул обработки.
+    """
+    if getattr(instance, '_image_changed', False):
+        recipe_id = instance.id
+        transaction.on_commit(
+            lambda: schedule_recipe_image_processing(recipe_id)
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_search_index_saved(sender, instance, **kwargs):
+    """Обновляет поисковый индекс по названию и описанию рецепта."""
+    update_search_index([instance.id])
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_search_index_deleted(sender, instance, **kwargs):
+    """Удаляет рецепт из поискового индекса."""
+    delete_from_search_index(instance.id)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    """
+    Увеличивает счетчик рецептов автора и после коммита
+    рассылает новый рецепт по лентам подписчиков.
+    """
+    if created:
+        User.objects.filter(id=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1
+        )
+        recipe_id = instance.id
+        transaction.on_commit(lambda: schedule_fan_out(recipe_id))
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Уменьшает счетчик рецептов автора, если рецепт удаляется
+    не вместе с автором.
+    """
+    if is_deleted_with(origin, User):
+        return
+    User.objects.filter(
+        id=instance.author_id, recipes_count__gt=0
+    ).update(recipes_count=F('recipes_count') - 1)
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_created(sender, instance, created, **kwargs):
+    """Увеличивает счетчик добавлений рецепта в избранное."""
+    if created:
+        Recipe.objects.filter(id=instance.recipe_id).update(
+            favorites_count=F('favorites_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Уменьшает счетчик добавлений рецепта в избранное. При удалении
+    рецепта счетчик удаляется вместе с ним, а при удалении пользователя
+    счетчики уменьшает user_deleting.
+    """
+    if is_deleted_with(origin, (Recipe, User)):
+        return
+    Recipe.objects.filter(
+        id=instance.recipe_id, favorites_count__gt=0
+    ).update(favorites_count=F('favorites_count') - 1)
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(sender, instance, created, **kwargs):
+    """Добавляет в ленту подписчика последние рецепты автора."""
+    if created:
+        update_pull_authors(instance.author_id)
+        backfill_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Удаляет из ленты бывшего подписчика рецепты автора. При удалении
+    пользователя ленты очищает каскад, а кеш авторов - user_deleting.
+    """
+    if is_deleted_with(origin, User):
+        return
+    trim_timeline(instance.user_id, instance.author_id)
+    update_pull_authors(instance.author_id)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    """
+    Перед удалением пользователя одним запросом уменьшает счетчики
+    рецептов, которые он добавил в избранное, и сбрасывает кеш авторов
+    ленты, если удаление может изменить их состав.
+    """
+    Recipe.objects.filter(
+        favorites__user=instance, favorites_count__gt=0
+    ).update(favorites_count=F('favorites_count') - 1)
+    forget_feed_user(instance.id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    """
+    Удаляет пользователя из кеша аутентификации после любого изменения:
+    смены пароля, деактивации, обновления профиля или аватара.
+    """
+    for key in Token.objects.filter(user=instance).values_list(
+        'key', flat=True
+    ):
+        invalidate_token(key)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Удаляет токен из кеша аутентификации, в том числе при выходе."""
+    invalidate_token(instance.key)
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from backend_foodgram.models import Favorite, Recipe
+
+User = get_user_model()
+
+
+class CascadeDeleteTests(TestCase):
+    """
+    Тесты того, что каскадное удаление не выполняет отдельный запрос
+    обновления счетчиков на каждую удаляемую строку.
+    """
+
+    def create_users(self, prefix, number):
+        return User.objects.bulk_create(
+            User(
+                username=f'{prefix}_{index}',
+                email=f'{prefix}_{index}@foodgram.com', password='!'
+            ) for index in range(number)
+        )
+
+    def create_recipe(self, author, name='Борщ'):
+        return Recipe.objects.create(
+            author=author, name=name, text='Рецепт', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+
+    def count_recipe_delete_queries(self, prefix, favorites):
+        author = User.objects.create_user(
+            username=prefix, email=f'{prefix}@foodgram.com', password='!'
+        )
+        recipe = self.create_recipe(author)
+        Favorite.objects.bulk_create(
+            Favorite(user=user, recipe=recipe)
+            for user in self.create_users(prefix, favorites)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            recipe.delete()
+        author.refresh_from_db()
+        self.assertEqual(author.recipes_count, 0)
+        return len(queries)
+
+    def count_user_delete_queries(self, prefix, favorites):
+        author = User.objects.create_user(
+            username=prefix, email=f'{prefix}@foodgram.com', password='!'
+        )
+        recipe = self.create_recipe(author)
+        Favorite.objects.bulk_create(
+            Favorite(user=user, recipe=recipe)
+            for user in self.create_users(prefix, favorites)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            author.delete()
+        return len(queries)
+
+    def test_recipe_delete_queries_do_not_grow_with_favorites(self):
+        self.assertEqual(
+            self.count_recipe_delete_queries('few', 3),
+            self.count_recipe_delete_queries('many', 30)
+        )
+
+    def test_user_delete_queries_do_not_grow_with_favorites(self):
+        self.assertEqual(
+            self.count_user_delete_queries('few', 3),
+            self.count_user_delete_queries('many', 30)
+        )
+
+    def test_user_delete_decrements_favorites_of_other_recipes(self):
+        author, reader = self.create_users('user', 2)
+        recipes = [self.create_recipe(author, name) for name in 'АБ']
+        Favorite.objects.create(user=reader, recipe=recipes[0])
+        Favorite.objects.create(user=reader, recipe=recipes[1])
+        Favorite.objects.create(user=author, recipe=recipes[1])
+        reader.delete()
+        self.assertEqual(
+            sorted(Recipe.objects.values_list('favorites_count', flat=True)),
+            [0, 1]
+        )
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from backend_foodgram import ingredient_index
+from backend_foodgram.catalog import get_catalog_version_key
+from backend_foodgram.models import Ingredient
+
+
+class IngredientCatalogTests(TestCase):
+    """Тесты кеша справочника ингредиентов."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = mock.patch.object(ingredient_index, '_index', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_names(self, name):
+        response = self.client.get('/api/ingredients/', {'name': name})
+        self.assertEqual(response.status_code, 200)
+        return [ingredient['name'] for ingredient in response.json()]
+
+    def test_new_ingredient_is_listed_after_commit(self):
+        self.assertEqual(self.get_names('соль'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.assertEqual(self.get_names('соль'), ['соль'])
+
+    def test_index_is_rebuilt_when_other_worker_bumps_version(self):
+        self.assertEqual(self.get_names('соль'), [])
+        # Другой воркер добавил ингредиент: индекс этого процесса
+        # не сбрасывался, меняется только версия в общем кеше.
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        cache.set(get_catalog_version_key('ingredients'), 1)
+        self.assertEqual(self.get_names('соль'), ['соль'])
+        self.assertEqual(ingredient_index.get_ingredient_index().version, 1)
+
+    def test_gzip_and_identity_have_different_etags(self):
+        identity = self.client.get('/api/ingredients/')
+        compressed = self.client.get(
+            '/api/ingredients/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertNotEqual(identity['ETag'], compressed['ETag'])
+        self.assertEqual(
+            self.client.get(
+                '/api/ingredients/', HTTP_ACCEPT_ENCODING='gzip',
+                HTTP_IF_NONE_MATCH=compressed['ETag']
+            ).status_code, 304
+        )
+        self.assertEqual(
+            self.client.get(
+                '/api/ingredients/', HTTP_IF_NONE_MATCH=compressed['ETag']
+            ).status_code, 200
+        )
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from backend_foodgram.models import Favorite, Ingredient, Recipe, Tag
+
+User = get_user_model()
+
+
+class CounterFieldsTests(TestCase):
+    """
+    Тесты того, что сохранение объектов не затирает счетчики,
+    которые сигналы меняют атомарным UPDATE.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', email='author@foodgram.com',
+            password='Old-password-1'
+        )
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@foodgram.com', password='!'
+        )
+        cls.tag = Tag.objects.create(name='Обед', slug='lunch')
+        cls.ingredient = Ingredient.objects.create(
+            name='Соль', measurement_unit='г'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name='Борщ', text='Рецепт', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+        cls.recipe.tags.set((cls.tag,))
+        Favorite.objects.create(user=cls.reader, recipe=cls.recipe)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_password_change_keeps_recipes_count(self):
+        user = User.objects.get(id=self.author.id)
+        Recipe.objects.create(
+            author=self.author, name='Щи', text='Рецепт', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+        self.client.force_authenticate(user)
+        response = self.client.post('/api/users/set_password/', {
+            'current_password': 'Old-password-1',
+            'new_password': 'New-password-2'
+        })
+        self.assertEqual(response.status_code, 201)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 2)
+        self.assertTrue(self.author.check_password('New-password-2'))
+
+    def test_recipe_edit_keeps_favorites_count(self):
+        Favorite.objects.create(user=self.author, recipe=self.recipe)
+        response = self.client.patch(
+            f'/api/recipes/{self.recipe.id}/', {
+                'name': 'Борщ красный', 'text': 'Рецепт',
+                'cooking_time': 20, 'tags': [self.tag.id],
+                'ingredients': [{'id': self.ingredient.id, 'amount': 5}]
+            }, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.name, 'Борщ красный')
+        self.assertEqual(self.recipe.favorites_count, 2)
+
+    def test_save_without_update_fields_skips_counters(self):
+        recipe = Recipe.objects.get(id=self.recipe.id)
+        Recipe.objects.filter(id=recipe.id).update(favorites_count=5)
+        recipe.name = 'Борщ зеленый'
+        recipe.save()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.name, 'Борщ зеленый')
+        self.assertEqual(recipe.favorites_count, 5)
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from backend_foodgram.feed import (
+    fan_out_recipe, get_feed_recipe_ids, get_pull_author_ids
+)
+from backend_foodgram.models import Recipe, TimelineEntry
+from users.models import Subscription
+
+User = get_user_model()
+
+
+@override_settings(FEED_PULL_FOLLOWERS_THRESHOLD=2)
+class PullAuthorsTests(TestCase):
+    """
+    Тесты того, что рассылка и чтение ленты выбирают режим автора
+    по одному множеству, которое сбрасывается при пересечении порога.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.first, cls.second = (
+            User.objects.create_user(
+                username=name, email=f'{name}@foodgram.com', password='!'
+            ) for name in ('author', 'first', 'second')
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def create_recipe(self):
+        return Recipe.objects.create(
+            author=self.author, name='Борщ', text='Рецепт', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+
+    def test_crossing_threshold_switches_author_to_pull(self):
+        Subscription.objects.create(user=self.first, author=self.author)
+        self.assertNotIn(self.author.id, get_pull_author_ids())
+        Subscription.objects.create(user=self.second, author=self.author)
+        self.assertIn(self.author.id, get_pull_author_ids())
+        recipe = self.create_recipe()
+        fan_out_recipe(recipe.id)
+        self.assertFalse(TimelineEntry.objects.filter(recipe=recipe).exists())
+        self.assertEqual(get_feed_recipe_ids(self.first), ([recipe.id], None))
+
+    def test_dropping_below_threshold_switches_author_to_push(self):
+        Subscription.objects.create(user=self.first, author=self.author)
+        Subscription.objects.create(user=self.second, author=self.author)
+        self.assertIn(self.author.id, get_pull_author_ids())
+        Subscription.objects.filter(user=self.second).delete()
+        self.assertNotIn(self.author.id, get_pull_author_ids())
+        recipe = self.create_recipe()
+        fan_out_recipe(recipe.id)
+        self.assertEqual(get_feed_recipe_ids(self.first), ([recipe.id], None))
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.first, recipe=recipe
+            ).exists()
+        )
+
+    def test_deleting_pull_author_resets_cache_once(self):
+        Subscription.objects.create(user=self.first, author=self.author)
+        Subscription.objects.create(user=self.second, author=self.author)
+        self.assertIn(self.author.id, get_pull_author_ids())
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.author.delete()
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotIn(self.author.id, get_pull_author_ids())
+
+
+class SubscriptionCascadeTests(TestCase):
+    """
+    Тесты того, что удаление автора не обрабатывает подписки
+    и записи лент по одной.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def count_author_delete_queries(self, prefix, followers):
+        author = User.objects.create_user(
+            username=prefix, email=f'{prefix}@foodgram.com', password='!'
+        )
+        recipe = Recipe.objects.create(
+            author=author, name='Борщ', text='Рецепт', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+        users = User.objects.bulk_create(
+            User(
+                username=f'{prefix}_{index}',
+                email=f'{prefix}_{index}@foodgram.com', password='!'
+            ) for index in range(followers)
+        )
+        for user in users:
+            Subscription.objects.create(user=user, author=author)
+        self.assertEqual(
+            TimelineEntry.objects.filter(recipe=recipe).count(), followers
+        )
+        author_id = author.id
+        with CaptureQueriesContext(connection) as queries:
+            author.delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(author_id=author_id).exists()
+        )
+        return len(queries)
+
+    def test_author_delete_queries_do_not_grow_with_followers(self):
+        self.assertEqual(
+            self.count_author_delete_queries('few', 3),
+            self.count_author_delete_queries('many', 30)
+        )
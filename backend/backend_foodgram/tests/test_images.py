@@ -0,0 +1,44 @@
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from backend_foodgram import images
+from backend_foodgram.serializers import Base64ImageField
+
+import base64
+
+
+def make_data_url(size):
+    buffer = BytesIO()
+    Image.new('RGB', size).save(buffer, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+class RecipeImageFieldTests(SimpleTestCase):
+    """Тесты ограничений изображения рецепта."""
+
+    def test_accepts_small_image(self):
+        image = Base64ImageField().to_internal_value(make_data_url((8, 8)))
+        self.assertTrue(image.name.endswith('.png'))
+
+    @override_settings(RECIPE_IMAGE_MAX_UPLOAD_SIZE=64)
+    def test_rejects_payload_over_byte_limit(self):
+        with self.assertRaisesMessage(ValidationError, 'Размер изображения'):
+            Base64ImageField().to_internal_value(make_data_url((200, 200)))
+
+    @override_settings(RECIPE_MAX_PIXELS=100)
+    def test_rejects_image_over_pixel_limit(self):
+        with self.assertRaisesMessage(ValidationError, 'пикселей'):
+            Base64ImageField().to_internal_value(make_data_url((20, 20)))
+
+    def test_full_queue_drops_task(self):
+        with mock.patch.object(images, '_slots') as slots, \
+                mock.patch.object(images, 'process_recipe_image') as process:
+            slots.acquire.return_value = False
+            images.schedule_recipe_image_processing(1)
+        process.assert_not_called()
@@ -0,0 +1,259 @@
+from types import SimpleNamespace
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from backend_foodgram.models import (
+    Favorite, Ingredient, Recipe, RecipeIngredient, RecipeShortLink,
+    RecipeTag, ShoppingCart, Tag
+)
+from backend_foodgram.utils import generate_short_link, get_ingredients_list
+from backend_foodgram.views import RecipeViewSet, UserSubscriptionsViewSet
+from users.models import Subscription
+
+import random
+import re
+
+User = get_user_model()
+
+RECIPES = 5000
+TAGS = 10
+INGREDIENTS = 2000
+INGREDIENTS_PER_RECIPE = 8
+FAVORITES_PER_USER = 20
+CART_PER_USER = 5
+SUBSCRIPTIONS_PER_USER = 10
+BATCH_SIZE = 5000
+# Таблицы с таким числом строк и больше считаются большими.
+# Справочники тегов и ингредиентов небольшие и читаются целиком.
+MIN_ROWS = 1000
+SEQ_SCAN_PATTERN = re.compile(r'Seq Scan on (\w+)')
+
+
+def seed(recipes_total):
+    """
+    Функция, заполняющая БД тестовыми данными в пропорциях,
+    близких к рабочим: на пользователя приходится 10 рецептов.
+    """
+    users = User.objects.bulk_create(
+        User(
+            username=f'plan_{number}', email=f'plan_{number}@foodgram.com',
+            password='!'
+        ) for number in range(max(recipes_total // 10, 10))
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(name=f'plan_{number}', slug=f'plan_{number}')
+        for number in range(TAGS)
+    )
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(name=f'plan_{number}', measurement_unit='г')
+        for number in range(INGREDIENTS)
+    )
+    recipes = Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author=random.choice(users), name=f'plan_{number}',
+                text='plan', cooking_time=1,
+                image='recipes/images/plan.png'
+            ) for number in range(recipes_total)
+        ), batch_size=BATCH_SIZE
+    )
+    RecipeTag.objects.bulk_create(
+        (
+            RecipeTag(recipe=recipe, tag=random.choice(tags))
+            for recipe in recipes
+        ), batch_size=BATCH_SIZE
+    )
+    RecipeIngredient.objects.bulk_create(
+        (
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for recipe in recipes
+            for ingredient in random.sample(
+                ingredients, INGREDIENTS_PER_RECIPE
+            )
+        ), batch_size=BATCH_SIZE
+    )
+    for model, per_user, field in (
+        (Favorite, FAVORITES_PER_USER, 'recipe'),
+        (ShoppingCart, CART_PER_USER, 'recipe'),
+        (Subscription, SUBSCRIPTIONS_PER_USER, 'author'),
+    ):
+        targets = recipes if field == 'recipe' else users
+        model.objects.bulk_create(
+            (
+                model(user=user, **{field: target})
+                for user in users
+                for target in random.sample(targets, per_user)
+            ), batch_size=BATCH_SIZE
+        )
+    RecipeShortLink.objects.bulk_create(
+        (
+            RecipeShortLink(
+                recipe=recipe, short_link=generate_short_link(recipe.id)
+            ) for recipe in recipes
+        ), batch_size=BATCH_SIZE
+    )
+    return users, tags, recipes
+
+
+def explain(queryset):
+    """
+    Функция, возвращающая план запроса. QuerySet.explain() в Django 4.2
+    строит некорректный SQL для фильтра по оконной функции, поэтому
+    EXPLAIN добавляется к готовому SQL.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}', params)
+        return '\n'.join(row[0] for row in cursor.fetchall())
+
+
+def get_view_queryset(viewset, user, params=''):
+    """
+    Функция, возвращающая queryset действия list вьюсета
+    с примененными фильтрами, как при реальном запросе.
+    """
+    view = viewset(action_map={'get': 'list'}, kwargs={}, format_kwarg=None)
+    view.request = view.initialize_request(
+        APIRequestFactory().get(f'/?{params}')
+    )
+    view.request.user = user
+    return view.filter_queryset(view.get_queryset())
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Планы запросов проверяются только в PostgreSQL.'
+)
+class QueryPlanTests(TestCase):
+    """
+    Тесты планов горячих запросов: в них не должно быть
+    последовательного сканирования больших таблиц.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        random.seed(0)
+        cls.users, cls.tags, cls.recipes = seed(RECIPES)
+        cls.large_tables = set()
+        with connection.cursor() as cursor:
+            for model in (
+                User, Tag, Ingredient, Recipe, RecipeTag,
+                RecipeIngredient, Favorite, ShoppingCart,
+                Subscription, RecipeShortLink
+            ):
+                table = model._meta.db_table
+                cursor.execute(f'ANALYZE {table}')
+                if model in (Tag, Ingredient):
+                    continue
+                if model.objects.count() >= MIN_ROWS:
+                    cls.large_tables.add(table)
+
+    def setUp(self):
+        self.user = self.users[0]
+        self.recipe = self.recipes[len(self.recipes) // 2]
+
+    def get_hot_queries(self):
+        """Метод, возвращающий пары (название, queryset) горячих запросов."""
+        page = list(
+            Recipe.objects.order_by('-id').values_list('id', flat=True)[:10]
+        )
+        subscriptions = get_view_queryset(
+            UserSubscriptionsViewSet, self.user, 'recipes_limit=3'
+        )
+        subscription_recipes = (
+            subscriptions._prefetch_related_lookups[0].queryset
+        )
+        following_ids = list(
+            Subscription.objects.filter(user=self.user).values_list(
+                'author_id', flat=True
+            )
+        )
+        return (
+            ('recipe_list', get_view_queryset(RecipeViewSet, self.user)[:10]),
+            (
+                'recipe_list_by_author',
+                get_view_queryset(
+                    RecipeViewSet, self.user,
+                    f'author={self.recipe.author_id}'
+                )[:10]
+            ),
+            (
+                'recipe_list_by_tags',
+                get_view_queryset(
+                    RecipeViewSet, self.user,
+                    f'tags={self.tags[0].slug}&tags={self.tags[1].slug}'
+                )[:10]
+            ),
+            (
+                'recipe_list_favorited',
+                get_view_queryset(
+                    RecipeViewSet, self.user, 'is_favorited=1'
+                )[:10]
+            ),
+            (
+                'recipe_list_in_shopping_cart',
+                get_view_queryset(
+                    RecipeViewSet, self.user, 'is_in_shopping_cart=1'
+                )[:10]
+            ),
+            (
+                'recipe_detail',
+                Recipe.objects.with_user_flags(self.user).filter(
+                    id=self.recipe.id
+                )
+            ),
+            (
+                'recipe_ingredients',
+                RecipeIngredient.objects.filter(
+                    recipe_id__in=page
+                ).select_related('ingredient')
+            ),
+            ('recipe_tags', RecipeTag.objects.filter(recipe_id__in=page)),
+            (
+                'short_link',
+                RecipeShortLink.objects.filter(
+                    short_link=generate_short_link(self.recipe.id)
+                ).values_list('recipe_id', flat=True)
+            ),
+            ('subscriptions', subscriptions[:10]),
+            (
+                'subscription_recipes',
+                subscription_recipes.filter(author_id__in=following_ids)
+            ),
+            (
+                'following_ids',
+                Subscription.objects.filter(user=self.user).values_list(
+                    'author_id', flat=True
+                )
+            ),
+            (
+                'shopping_list',
+                get_ingredients_list(SimpleNamespace(user=self.user))
+            ),
+        )
+
+    def test_hot_queries_do_not_scan_large_tables(self):
+        for name, queryset in self.get_hot_queries():
+            with self.subTest(name):
+                plan = explain(queryset)
+                self.assertFalse(
+                    self.large_tables.intersection(
+                        SEQ_SCAN_PATTERN.findall(plan)
+                    ), plan
+                )
+
+    def test_recipes_by_author_use_author_index(self):
+        plan = explain(get_view_queryset(
+            RecipeViewSet, self.user, f'author={self.recipe.author_id}'
+        )[:10])
+        self.assertIn('recipe_author_id_idx', plan)
+
+    def test_recipes_by_tags_use_tag_index(self):
+        plan = explain(get_view_queryset(
+            RecipeViewSet, self.user, f'tags={self.tags[0].slug}'
+        )[:10])
+        self.assertIn('recipetag_tag_recipe_idx', plan)
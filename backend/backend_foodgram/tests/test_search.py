@@ -0,0 +1,101 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from backend_foodgram.models import Recipe
+from backend_foodgram.search import get_fts_query, search_recipes
+
+User = get_user_model()
+
+
+class SearchQueryTests(TestCase):
+    """Тесты построения поисковых запросов."""
+
+    def test_fts_query_matches_every_word_by_prefix(self):
+        self.assertEqual(
+            get_fts_query('Борщ  с-мясом!'), '"Борщ"* "с"* "мясом"*'
+        )
+
+    def test_fts_query_drops_fts_syntax(self):
+        self.assertEqual(
+            get_fts_query('"суп" OR NEAR(*)'), '"суп"* "OR"* "NEAR"*'
+        )
+        self.assertEqual(get_fts_query('  *"() '), '')
+
+    def test_postgres_query_uses_search_vector_and_rank(self):
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            queryset = search_recipes(Recipe.objects.all(), 'борщ')
+        sql = str(queryset.query)
+        self.assertIn('@@', sql)
+        self.assertIn('websearch_to_tsquery', sql)
+        self.assertIn('ts_rank', sql)
+        self.assertIn('search_vector', sql)
+        self.assertEqual(queryset.query.order_by, ('-rank', '-id'))
+
+
+@skipUnless(
+    connection.vendor == 'sqlite', 'Таблица FTS5 есть только в SQLite.'
+)
+class SqliteSearchTests(TestCase):
+    """Тесты полнотекстового поиска через таблицу FTS5 SQLite."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', email='author@foodgram.com', password='!'
+        )
+        cls.in_text = cls.create_recipe(
+            'Суп дня', 'Наваристый борщ со сметаной'
+        )
+        cls.in_name = cls.create_recipe('Борщ', 'Классический рецепт')
+        cls.other = cls.create_recipe('Оладьи', 'На кефире')
+
+    @classmethod
+    def create_recipe(cls, name, text):
+        return Recipe.objects.create(
+            author=cls.author, name=name, text=text, cooking_time=10,
+            image='recipes/images/test.png'
+        )
+
+    def search(self, query):
+        return list(
+            search_recipes(Recipe.objects.all(), query).values_list(
+                'id', flat=True
+            )
+        )
+
+    def test_name_match_ranks_above_text_match(self):
+        self.assertEqual(
+            self.search('борщ'), [self.in_name.id, self.in_text.id]
+        )
+
+    def test_words_are_matched_by_prefix(self):
+        self.assertEqual(self.search('олад'), [self.other.id])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search('борщ сметана'), [])
+        self.assertEqual(self.search('борщ сметаной'), [self.in_text.id])
+
+    def test_query_without_words_finds_nothing(self):
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_index_follows_recipe_changes(self):
+        self.other.name = 'Борщ зеленый'
+        self.other.save()
+        self.assertIn(self.other.id, self.search('зеленый'))
+        self.in_name.delete()
+        self.assertEqual(
+            sorted(self.search('борщ')),
+            sorted([self.in_text.id, self.other.id])
+        )
+
+    def test_search_filter_keeps_rank_order(self):
+        response = APIClient().get('/api/recipes/', {'search': 'борщ'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.json()['results']],
+            [self.in_name.id, self.in_text.id]
+        )
@@ -1,9 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from .async_views import (
+    ingredient_list, recipe_detail, recipe_list, tag_list
+)
 from .views import (
     TagViewSet, IngredientViewSet, RecipeViewSet,
-    UserSubscriptionsViewSet, LoginView, LogOutView, UserViewSet
+    UserSubscriptionsViewSet, LoginView, LogOutView, UserViewSet,
+    DatabasePoolStatsView
 )
 
 router = DefaultRouter()
@@ -20,5 +24,13 @@ router.register('users', UserViewSet, basename='users')
 urlpatterns = [
     path('auth/token/login/', LoginView.as_view(), name='token-login'),
     path('auth/token/logout/', LogOutView.as_view(), name='token-logout'),
+    path(
+        'health/db-pool/', DatabasePoolStatsView.as_view(),
+        name='db-pool-stats'
+    ),
+    path('tags/', tag_list),
+    path('ingredients/', ingredient_list),
+    path('recipes/', recipe_list),
+    path('recipes/<int:pk>/', recipe_detail),
     path('', include(router.urls))
 ]
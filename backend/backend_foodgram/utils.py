@@ -1,23 +1,118 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
 
-from .models import ShoppingCart
+from .cache import LRUCache, is_cache_shared
+from .models import RecipeIngredient, RecipeShortLink
+from users.models import Subscription
 
-import random
 import string
 
 
-def generate_short_link():
+SHORT_LINK_ALPHABET = string.digits + string.ascii_letters
+SHORT_LINK_LENGTH = 4
+SHORT_LINK_SPACE = len(SHORT_LINK_ALPHABET) ** SHORT_LINK_LENGTH
+# Множитель взаимно прост с 62, поэтому умножение по модулю
+# SHORT_LINK_SPACE переставляет коды и не дает коллизий.
+SHORT_LINK_MULTIPLIER = 9576359
+
+short_link_cache = LRUCache(
+    settings.SHORT_LINK_LOCAL_CACHE_SIZE,
+    settings.SHORT_LINK_LOCAL_CACHE_TTL
+)
+
+
+def encode_base62(number, length=1):
     """
-    Функция для генерации случайного slug
-    для короткой ссылки на рецепт.
+    Функция, переводящая число в строку base62
+    длиной не меньше length символов.
     """
-    short_link = ''.join(
-        [
-            random.choice(string.ascii_letters + string.digits)
-            for _ in range(3)
-        ]
-    )
-    return short_link
+    base = len(SHORT_LINK_ALPHABET)
+    chars = []
+    while number or len(chars) < length:
+        number, remainder = divmod(number, base)
+        chars.append(SHORT_LINK_ALPHABET[remainder])
+    return ''.join(reversed(chars))
+
+
+def generate_short_link(recipe_id):
+    """
+    Функция для генерации slug короткой ссылки на рецепт.
+    Первые SHORT_LINK_SPACE рецептов получают перемешанные коды
+    из SHORT_LINK_LENGTH символов, дальше длина кода растет сама.
+    Коды всегда длиннее трех символов, поэтому не пересекаются
+    со старыми случайными ссылками.
+    """
+    if recipe_id < SHORT_LINK_SPACE:
+        return encode_base62(
+            recipe_id * SHORT_LINK_MULTIPLIER % SHORT_LINK_SPACE,
+            SHORT_LINK_LENGTH
+        )
+    return encode_base62(recipe_id)
+
+
+def get_short_link_cache_key(short_link):
+    return f'short_link:{short_link}'
+
+
+def resolve_short_link(short_link):
+    """
+    Функция, возвращающая id рецепта по короткой ссылке.
+    Сначала проверяется LRU-кеш процесса, затем общий кеш Django,
+    и только потом база данных. Для неизвестной ссылки возвращает None.
+    Кеш Django, не общий для воркеров, пропускается: после удаления
+    рецепта другие воркеры хранили бы ссылку до SHORT_LINK_CACHE_TIMEOUT.
+    """
+    recipe_id = short_link_cache.get(short_link)
+    if recipe_id is not None:
+        return recipe_id
+    shared = is_cache_shared()
+    cache_key = get_short_link_cache_key(short_link)
+    recipe_id = cache.get(cache_key) if shared else None
+    if recipe_id is None:
+        recipe_id = RecipeShortLink.objects.filter(
+            short_link=short_link
+        ).values_list('recipe_id', flat=True).first()
+        if recipe_id is None:
+            return None
+        if shared:
+            cache.set(
+                cache_key, recipe_id, settings.SHORT_LINK_CACHE_TIMEOUT
+            )
+    short_link_cache.set(short_link, recipe_id)
+    return recipe_id
+
+
+async def aresolve_short_link(short_link):
+    """
+    Асинхронная версия resolve_short_link.
+    """
+    recipe_id = short_link_cache.get(short_link)
+    if recipe_id is not None:
+        return recipe_id
+    shared = is_cache_shared()
+    cache_key = get_short_link_cache_key(short_link)
+    recipe_id = await cache.aget(cache_key) if shared else None
+    if recipe_id is None:
+        recipe_id = await RecipeShortLink.objects.filter(
+            short_link=short_link
+        ).values_list('recipe_id', flat=True).afirst()
+        if recipe_id is None:
+            return None
+        if shared:
+            await cache.aset(
+                cache_key, recipe_id, settings.SHORT_LINK_CACHE_TIMEOUT
+            )
+    short_link_cache.set(short_link, recipe_id)
+    return recipe_id
+
+
+def invalidate_short_link(short_link):
+    """Функция, удаляющая короткую ссылку из кешей."""
+    short_link_cache.delete(short_link)
+    cache.delete(get_short_link_cache_key(short_link))
 
 
 def generate_full_short_url(link):
@@ -30,71 +125,76 @@ def generate_full_short_url(link):
     }
 
 
+def get_following_ids(request):
+    """
+    Функция, возвращающая множество id авторов, на которых подписан
+    текущий пользователь. Множество загружается одним запросом
+    и запоминается на объекте запроса.
+    """
+    following_ids = getattr(request, 'following_ids', None)
+    if following_ids is None:
+        following_ids = frozenset(
+            Subscription.objects.filter(
+                user=request.user
+            ).values_list('author_id', flat=True)
+        ) if request.user.is_authenticated else frozenset()
+        request.following_ids = following_ids
+    return following_ids
+
+
 def get_ingredients_list(request):
     """
-    Функция для генерации строки со списком
-    ингредиентов из списка покупок.
-    """
-    ingredients = []
-    # Получаем все рецепты, добавленные в
-    # корзину покупок текущим пользователем
-    shopping_cart_recipes = ShoppingCart.objects.filter(
-        user=request.user
-    ).select_related('recipe')
-    # Проходим по каждому элементу в корзине покупок
-    for item in shopping_cart_recipes:
-        # Получаем все ингредиенты для текущего рецепта
-        recipe_ingredients = item.recipe.recipeingredients.all()
-        # Проходим по всем ингредиентам текущего рецепта
-        for recipe_ingredient in recipe_ingredients:
-            # Создаем словарь с данными об ингредиенте
-            ingredient_data = {
-                'name': recipe_ingredient.ingredient.name,
-                'measurement_unit':
-                    recipe_ingredient.ingredient.measurement_unit,
-                'amount': recipe_ingredient.amount
-            }
-            # Проверяем, существует ли уже этот ингредиент в списке
-            existing_ingredient = next(
-                (
-                    ing for ing in ingredients if
-                    ing['name'] == ingredient_data['name']
-                    and ing[
-                        'measurement_unit'
-                    ] == ingredient_data['measurement_unit']
-                ),
-                None
-            )
-            # Если ингредиент уже существует, обновляем его количество
-            if existing_ingredient:
-                existing_ingredient['amount'] = round(
-                    existing_ingredient[
-                        'amount'
-                    ] + ingredient_data['amount'], 3
-                )
-            else:
-                # Если ингредиент новый, добавляем его в список
-                ingredients.append(ingredient_data)
-    # Формируем строку из списка ингредиентов
-    _string = ''
-    for ingredient in ingredients:
-        _string += (
-            f'{ingredient["name"]} — '
-            f'{ingredient["amount"]} '
-            f'{ingredient["measurement_unit"]}\n'
-        )
-    return _string  # Возвращаем сформированную строку
+    Функция, возвращающая суммарное количество каждого ингредиента
+    из рецептов в списке покупок. Агрегация выполняется одним запросом.
+    """
+    return RecipeIngredient.objects.filter(
+        recipe__shopping_carts__user=request.user
+    ).values(
+        'ingredient__name', 'ingredient__measurement_unit'
+    ).annotate(
+        amount=Sum('amount')
+    ).order_by('ingredient__name', 'ingredient__measurement_unit')
 
 
-def get_shopping_cart_as_txt(request) -> HttpResponse:
+def format_ingredient_line(ingredient):
+    return (
+        f'{ingredient["ingredient__name"]} — '
+        f'{round(ingredient["amount"], 3)} '
+        f'{ingredient["ingredient__measurement_unit"]}\n'
+    )
+
+
+def iter_ingredients_lines(ingredients):
+    """
+    Генератор строк списка покупок.
+    """
+    for ingredient in ingredients.iterator():
+        yield format_ingredient_line(ingredient)
+
+
+async def aiter_ingredients_lines(ingredients):
     """
-    Функция для генерации HttpResponse с текстовым файлом,
+    Асинхронный генератор строк списка покупок.
+    Строки читаются из БД частями, как и в синхронной версии.
+    """
+    async for ingredient in ingredients.aiterator():
+        yield format_ingredient_line(ingredient)
+
+
+def get_shopping_cart_as_txt(request) -> StreamingHttpResponse:
+    """
+    Функция для генерации StreamingHttpResponse с текстовым файлом,
     содержащим список покупок.
+    Под ASGI Django читает синхронный итератор ответа целиком,
+    поэтому там файл отдается асинхронным генератором.
     """
-    ingredients_list = get_ingredients_list(request)
-    response = HttpResponse(
-        ingredients_list,
-        content_type='text/plain'
+    ingredients = get_ingredients_list(request)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        lines = aiter_ingredients_lines(ingredients)
+    else:
+        lines = iter_ingredients_lines(ingredients)
+    response = StreamingHttpResponse(
+        lines, content_type='text/plain; charset=utf-8'
     )
     response['Content-Disposition'] = (
         'attachment; '
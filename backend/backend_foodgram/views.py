@@ -1,13 +1,21 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    BooleanField, F, Prefetch, Value, Window
+)
+from django.db.models.functions import RowNumber
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 from rest_framework.viewsets import (
     ReadOnlyModelViewSet, GenericViewSet, ModelViewSet
@@ -15,12 +23,22 @@ from rest_framework.viewsets import (
 from rest_framework.mixins import ListModelMixin
 from rest_framework.permissions import IsAuthenticated
 
-from .filters import IngredientFilter, RecipeFilter
+from .catalog import get_catalog_response
+from .feed import FEED_MAX_LIMIT, get_feed_recipe_ids
+from .filters import RecipeFilter
+from .images import delete_unused_avatar, save_avatar
+from .ingredient_index import get_ingredient_index
 from .models import (
     Tag, Ingredient, Recipe, ShoppingCart, Favorite, RecipeShortLink
 )
 from users.models import Subscription
-from .pagination import PageLimitAndRecipesLimitPagination
+from users.permissions import IsAdmin
+from backend.db_pool.pool import get_pool_stats
+from .pagination import (
+    PageLimitAndRecipesLimitPagination, PageOrCursorPagination,
+    RecipePagination
+)
+from .passwords import verify_user_password
 from .permissions import IsAuthenticatedAndAuthor
 from .serializers import (
     TagSerializer, IngredientSerializer, RecipeCreateSerializer,
@@ -29,13 +47,11 @@ from .serializers import (
     UserGETSerializer, UserSignUpSerializer
 )
 from .utils import (
-    generate_short_link, generate_full_short_url,
+    generate_short_link, generate_full_short_url, aresolve_short_link,
     get_shopping_cart_as_txt,
     # get_shopping_cart_as_pdf
 )
 
-import base64
-
 User = get_user_model()
 
 
@@ -45,24 +61,52 @@ class TagViewSet(ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        """
+        Метод, отвечающий за получение списка тегов
+        из кеша отрендеренных ответов.
+        """
+        return get_catalog_response(
+            request, 'tags',
+            lambda: TagSerializer(self.get_queryset(), many=True).data
+        )
+
 
 class IngredientViewSet(ReadOnlyModelViewSet):
     """Вьюсет для обработки запросов, связанных с ингредиентами."""
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
-    filter_backends = (DjangoFilterBackend,)
-    filterset_class = IngredientFilter
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        """
+        Метод, отвечающий за поиск ингредиентов по названию.
+        Ответ формируется из индекса в памяти без обращения к БД
+        и кешируется в отрендеренном виде.
+        """
+        name = request.query_params.get('name', '').strip().lower()
+        return get_catalog_response(
+            request, 'ingredients',
+            lambda: get_ingredient_index().search(name),
+            variant=name
+        )
+
 
 class RecipeViewSet(ModelViewSet):
     """Вьюсет для обработки запросов, связанных с рецептами."""
     queryset = Recipe.objects.all().order_by('-id')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
-    pagination_class = PageLimitAndRecipesLimitPagination
+    pagination_class = RecipePagination
     http_method_names = ('get', 'post', 'patch', 'delete')
 
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return Recipe.objects.with_related().with_user_flags(
+                self.request.user
+            ).order_by('-id')
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeGETSerializer
@@ -162,19 +206,29 @@ class RecipeViewSet(ModelViewSet):
     @action(detail=True, methods=('get',), url_path='get-link')
     def get_short_link(self, request, pk):
         recipe = get_object_or_404(Recipe, id=pk)
-        recipe_short_link = RecipeShortLink.objects.filter(
-            recipe=recipe
+        existing = RecipeShortLink.objects.filter(recipe=recipe).values_list(
+            'short_link', flat=True
         ).first()
-        if recipe_short_link:
+        if existing is not None:
+            return Response(
+                generate_full_short_url(existing), status=status.HTTP_200_OK
+            )
+        short_link = generate_short_link(recipe.id)
+        try:
+            with transaction.atomic():
+                RecipeShortLink.objects.create(
+                    recipe=recipe, short_link=short_link
+                )
+        except IntegrityError:
+            # Ссылку успел создать параллельный запрос.
             return Response(
-                generate_full_short_url(recipe_short_link.short_link),
+                generate_full_short_url(
+                    RecipeShortLink.objects.filter(
+                        recipe=recipe
+                    ).values_list('short_link', flat=True).first()
+                ),
                 status=status.HTTP_200_OK
             )
-
-        short_link = generate_short_link()
-        while RecipeShortLink.objects.filter(short_link=short_link).exists():
-            short_link = generate_short_link()
-        RecipeShortLink.objects.create(recipe=recipe, short_link=short_link)
         return Response(
             generate_full_short_url(short_link),
             status=status.HTTP_201_CREATED
@@ -188,15 +242,72 @@ class RecipeViewSet(ModelViewSet):
         # response = get_shopping_cart_as_pdf(request)
         return response
 
-
-def redirect_short_link_view(request, short_link):
-    recipe_short_link = get_object_or_404(
-        RecipeShortLink, short_link=short_link
+    @action(
+        detail=False, methods=('get',), permission_classes=(IsAuthenticated,)
     )
-    recipe = get_object_or_404(Recipe, id=recipe_short_link.recipe.id)
-    return redirect(
-        f'https://lasellarfoodgram.ddns.net/recipes/{recipe.id}/'
+    def feed(self, request):
+        """
+        Метод, возвращающий ленту рецептов авторов, на которых подписан
+        пользователь, по убыванию id.
+        Следующая страница запрашивается по ссылке next (параметр before).
+        """
+        try:
+            limit = int(request.query_params.get(
+                'limit', settings.REST_FRAMEWORK['PAGE_SIZE']
+            ))
+            before = request.query_params.get('before')
+            before = int(before) if before else None
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= FEED_MAX_LIMIT:
+            return Response(
+                {
+                    'detail': 'limit должен быть числом от 1 до '
+                    f'{FEED_MAX_LIMIT}, before — id рецепта.'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        recipe_ids, next_before = get_feed_recipe_ids(
+            request.user, before, limit
+        )
+        recipes = Recipe.objects.with_related().with_user_flags(
+            request.user
+        ).filter(id__in=recipe_ids).order_by('-id')
+        next_link = None
+        if next_before is not None:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'before', next_before
+            )
+        return Response({
+            'next': next_link,
+            'results': RecipeGETSerializer(
+                recipes, many=True, context=self.get_serializer_context()
+            ).data
+        })
+
+
+async def redirect_short_link_view(request, short_link):
+    recipe_id = await aresolve_short_link(short_link)
+    if recipe_id is None:
+        raise Http404('Короткая ссылка не найдена.')
+    response = redirect(
+        f'https://lasellarfoodgram.ddns.net/recipes/{recipe_id}/'
+    )
+    patch_cache_control(
+        response, public=True,
+        max_age=settings.SHORT_LINK_REDIRECT_MAX_AGE
     )
+    return response
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    View-класс, отдающий статистику пула соединений с БД текущего процесса.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(get_pool_stats())
 
 
 class UserSubscriptionView(APIView):
@@ -246,9 +357,34 @@ class UserSubscriptionsViewSet(ListModelMixin, GenericViewSet):
     permission_classes = (IsAuthenticated,)
     pagination_class = PageLimitAndRecipesLimitPagination
 
+    def get_recipes_limit(self):
+        """
+        Метод, возвращающий значение параметра recipes_limit
+        или None, если параметр не передан или некорректен.
+        """
+        try:
+            recipes_limit = int(self.request.query_params['recipes_limit'])
+        except (KeyError, ValueError):
+            return None
+        return recipes_limit if recipes_limit > 0 else None
+
     def get_queryset(self):
+        recipes = Recipe.objects.order_by('-id')
+        recipes_limit = self.get_recipes_limit()
+        if recipes_limit is not None:
+            recipes = recipes.annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F('author'),
+                    order_by=F('id').desc()
+                )
+            ).filter(row_number__lte=recipes_limit)
         return User.objects.filter(
             following__user=self.request.user
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='limited_recipes')
         ).order_by('-id')
 
 
@@ -266,7 +402,7 @@ class LoginView(APIView):
                 {"error": "User  not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
-        if user.check_password(password):
+        if verify_user_password(user, password):
             token, created = Token.objects.get_or_create(user=user)
             return Response(
                 {'auth_token': token.key}, status=status.HTTP_200_OK
@@ -315,6 +451,7 @@ class UserViewSet(ModelViewSet):
     """
     queryset = User.objects.all().order_by('-id')
     serializer_class = UserGETSerializer
+    pagination_class = PageOrCursorPagination
     http_method_names = ('get', 'post', 'put', 'delete')
 
     def get_permissions(self):
@@ -344,15 +481,6 @@ class UserViewSet(ModelViewSet):
             return User.objects.get(id=self.kwargs.get('pk'))
         return False
 
-    def list(self, request, *args, **kwargs):
-        """
-        Метод, отвечающий за получение списка пользователей.
-        Обрабатывает GET-запросы на эндпоинт users/.
-        """
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
     def create(self, request, *args, **kwargs):
         """
         Метод, отвечающий за регистрацию пользователя.
@@ -404,9 +532,9 @@ class UserViewSet(ModelViewSet):
             return Response(
                 {'detail': exception}, status=status.HTTP_400_BAD_REQUEST
             )
-        if user.check_password(current_password):
+        if verify_user_password(user, current_password):
             user.set_password(new_password)
-            user.save()
+            user.save(update_fields=('password',))
             return Response(status=status.HTTP_201_CREATED)
         return Response(
             {'detail': 'Введен неверный пароль.'},
@@ -421,27 +549,20 @@ class UserViewSet(ModelViewSet):
         """
         user = request.user
         if request.method == 'PUT':
-            avatar = request.data.get('avatar')
-            if avatar:
-                if avatar.startswith('data:image/'):
-                    frmt, imgstr = avatar.split(';base64,')
-                    ext = frmt.split('/')[-1]
-                    avatar_file = ContentFile(
-                        base64.b64decode(imgstr),
-                        name=f'{user.username}.{ext}'
-                    )
-                    user.avatar.save(f'{user.username}.{ext}', avatar_file)
-                    return Response(
-                        {'avatar': user.avatar.url},
-                        status=status.HTTP_201_CREATED)
+            try:
+                avatar = save_avatar(user, request.data.get('avatar'))
+            except ValueError as error:
+                return Response(
+                    {'field_errors': ['avatar'], 'detail': str(error)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             return Response(
-                {'field_errors': ['avatar']},
-                status=status.HTTP_400_BAD_REQUEST
+                {'avatar': avatar.url}, status=status.HTTP_201_CREATED
             )
-        user = request.user
-        user.avatar.delete(save=False)
+        previous_name = user.avatar.name
         user.avatar = None
-        user.save()
+        user.save(update_fields=('avatar',))
+        delete_unused_avatar(previous_name)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=('post', 'delete'), url_path='subscribe')
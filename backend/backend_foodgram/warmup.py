@@ -0,0 +1,123 @@
+from threading import Thread
+
+from django.conf import settings
+from django.db import connection, connections
+from django.urls import get_resolver
+from rest_framework.test import APIRequestFactory
+
+from .catalog import get_rendered_catalog
+from .ingredient_index import get_ingredient_index
+from .models import RecipeShortLink, Tag
+from .serializers import (
+    RecipeCreateSerializer, RecipeShortSerializer, TagSerializer,
+    UserGETSerializer, UserSubscribeRepresentSerializer
+)
+from .utils import short_link_cache
+from .views import RecipeViewSet
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def open_db_connection():
+    connection.ensure_connection()
+
+
+def compile_url_resolver():
+    get_resolver().resolve('/api/recipes/')
+
+
+def build_catalogs():
+    get_rendered_catalog(
+        'tags', lambda: TagSerializer(Tag.objects.all(), many=True).data
+    )
+    index = get_ingredient_index()
+    get_rendered_catalog('ingredients', lambda: index.search(''))
+
+
+def load_short_links():
+    short_links = RecipeShortLink.objects.order_by('-id').values_list(
+        'short_link', 'recipe_id'
+    )[:settings.SHORT_LINK_LOCAL_CACHE_SIZE]
+    for short_link, recipe_id in short_links:
+        short_link_cache.set(short_link, recipe_id)
+
+
+def build_serializer_fields():
+    for serializer_class in (
+        RecipeCreateSerializer, RecipeShortSerializer,
+        UserGETSerializer, UserSubscribeRepresentSerializer
+    ):
+        serializer_class().fields
+
+
+def request_recipe_list():
+    host = next(
+        (
+            host for host in settings.ALLOWED_HOSTS
+            if host != '*' and not host.startswith('.')
+        ),
+        'localhost'
+    )
+    request = APIRequestFactory(SERVER_NAME=host).get('/api/recipes/')
+    RecipeViewSet.as_view({'get': 'list'})(request).render()
+
+
+WARMUP_STEPS = (
+    open_db_connection,
+    compile_url_resolver,
+    build_catalogs,
+    load_short_links,
+    build_serializer_fields,
+    request_recipe_list,
+)
+
+
+def run_warmup_steps():
+    started = time.perf_counter()
+    for step in WARMUP_STEPS:
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('Ошибка прогрева на шаге %s', step.__name__)
+            continue
+        logger.debug(
+            'Шаг прогрева %s: %.1f мс', step.__name__,
+            (time.perf_counter() - step_started) * 1000
+        )
+    logger.info(
+        'Прогрев воркера занял %.1f мс',
+        (time.perf_counter() - started) * 1000
+    )
+
+
+def run_warmup_steps_in_thread():
+    try:
+        run_warmup_steps()
+    finally:
+        connections.close_all()
+
+
+def warm_up():
+    """
+    Функция, прогревающая воркер после запуска: открывает соединение
+    с БД, компилирует URL-резолвер, строит справочники и карту коротких
+    ссылок и выполняет тестовый запрос к списку рецептов.
+    Ошибка одного шага не мешает остальным и запуску воркера.
+    Если приложение загружается внутри event loop, прогрев выполняется
+    в отдельном потоке.
+    """
+    if not settings.WARMUP_ENABLED:
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        run_warmup_steps()
+        return
+    thread = Thread(target=run_warmup_steps_in_thread, name='warmup')
+    thread.start()
+    thread.join()
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import statistics
+import time
+
+CONCURRENCY = (1, 4, 16)
+LOGINS_PER_THREAD = 10
+PASSWORD = 'benchmark-password-42'
+
+
+def login(view, factory, email):
+    request = factory.post(
+        '/api/auth/token/login/',
+        {'email': email, 'password': PASSWORD},
+        format='json'
+    )
+    started = time.perf_counter()
+    try:
+        status_code = view(request).status_code
+    finally:
+        connection.close()
+    return status_code, time.perf_counter() - started
+
+
+def run_benchmark():
+    started = time.perf_counter()
+    make_password(PASSWORD)
+    print(
+        f'{settings.PASSWORD_HASHERS[0]}: one hash '
+        f'{(time.perf_counter() - started) * 1000:.1f} ms, '
+        f'{settings.PASSWORD_CHECK_WORKERS} workers, '
+        f'queue {settings.PASSWORD_CHECK_QUEUE_SIZE}'
+    )
+    user = User.objects.create(
+        username='benchmark_login',
+        email='benchmark_login@foodgram.com',
+        password=make_password(PASSWORD)
+    )
+    view = LoginView.as_view()
+    factory = APIRequestFactory()
+    for threads in CONCURRENCY:
+        total = threads * LOGINS_PER_THREAD
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(
+                lambda _: login(view, factory, user.email), range(total)
+            ))
+        elapsed = time.perf_counter() - started
+        timings = sorted(timing for _, timing in results)
+        statuses = [status_code for status_code, _ in results]
+        print(
+            f'{threads} threads: {total / elapsed:.1f} logins/s, '
+            f'p50 {statistics.median(timings) * 1000:.1f} ms, '
+            f'p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.1f} ms, '
+            f'ok {statuses.count(200)}, throttled {statuses.count(429)}'
+        )
+
+
+if __name__ == '__main__':
+    import os
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    django.setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+    from rest_framework.test import APIRequestFactory
+    from backend_foodgram.views import LoginView
+    User = get_user_model()
+    # Пользователь создается в отдельной тестовой БД, которая удаляется
+    # после замеров: рабочая БД не изменяется.
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        run_benchmark()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import time
+
+CART_SIZES = (10, 100, 1000)
+INGREDIENTS = 500
+INGREDIENTS_PER_RECIPE = 8
+REPEATS = 5
+
+
+def seed_cart(user, ingredients, size):
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            author=user,
+            name=f'benchmark {size}-{number}',
+            text='benchmark',
+            cooking_time=1,
+            image='recipes/images/benchmark.png'
+        ) for number in range(size)
+    )
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe=recipe,
+            ingredient=ingredients[
+                (number * INGREDIENTS_PER_RECIPE + offset) % len(ingredients)
+            ],
+            amount=offset + 1
+        )
+        for number, recipe in enumerate(recipes)
+        for offset in range(INGREDIENTS_PER_RECIPE)
+    )
+    ShoppingCart.objects.bulk_create(
+        ShoppingCart(user=user, recipe=recipe) for recipe in recipes
+    )
+
+
+def run_benchmark():
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(name=f'benchmark {number}', measurement_unit='г')
+        for number in range(INGREDIENTS)
+    )
+    for size in CART_SIZES:
+        user = User.objects.create(
+            username=f'benchmark_{size}',
+            email=f'benchmark_{size}@foodgram.com'
+        )
+        seed_cart(user, ingredients, size)
+        request = SimpleNamespace(user=user)
+        timings = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            response = get_shopping_cart_as_txt(request)
+            lines = sum(1 for _ in response.streaming_content)
+            timings.append(time.perf_counter() - started)
+        print(
+            f'cart of {size} recipes: {lines} lines, '
+            f'best {min(timings) * 1000:.2f} ms, '
+            f'avg {sum(timings) / REPEATS * 1000:.2f} ms'
+        )
+
+
+if __name__ == '__main__':
+    import os
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+    from backend_foodgram.models import (
+        Ingredient, Recipe, RecipeIngredient, ShoppingCart
+    )
+    from backend_foodgram.utils import get_shopping_cart_as_txt
+    User = get_user_model()
+    # Данные создаются в отдельной тестовой БД, которая удаляется
+    # после замеров: рабочая БД не изменяется.
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        run_benchmark()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from backend_foodgram.pagination import EstimatedCountPaginator
 from .models import User, Subscription
 
 
@@ -8,10 +9,15 @@ class UserAdmin(admin.ModelAdmin):
     list_display = ('id', 'email', 'username', 'first_name', 'last_name')
     search_fields = ('username', 'email')
     list_filter = ('is_active', 'is_staff')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'author')
-    search_fields = ('user', 'author')
-    list_filter = ('user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    autocomplete_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
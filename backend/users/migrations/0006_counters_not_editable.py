@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество рецептов'),
+        ),
+    ]
@@ -1,11 +1,34 @@
 from django.contrib.auth.models import AbstractUser
 from django.db.models import (
     EmailField, CharField, ImageField, Model, ForeignKey, CASCADE,
-    UniqueConstraint
+    UniqueConstraint, PositiveIntegerField
 )
 
 
-class User(AbstractUser):
+class CountersMixin:
+    """
+    Примесь модели с денормализованными счетчиками из counter_fields.
+    Счетчики меняются только атомарным UPDATE в сигналах, а значение
+    в памяти может быть устаревшим, поэтому save() существующего
+    объекта без update_fields их не записывает.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class User(CountersMixin, AbstractUser):
     """Модель пользователя."""
     email = EmailField(unique=True, max_length=254)
     first_name = CharField(max_length=150)
@@ -15,6 +38,11 @@ class User(AbstractUser):
         'Аватар', upload_to='avatars/', blank=True, null=True
     )
     password = CharField(max_length=150)
+    recipes_count = PositiveIntegerField(
+        'Количество рецептов', default=0, editable=False
+    )
+
+    counter_fields = ('recipes_count',)
 
     class Meta:
         verbose_name = 'Пользователь'